@@ -14,9 +14,10 @@ def register():
     data = request.json
     return jsonify({"message": "User registered!", "data": data})
 
+# Development server only; use run.py in production
 if __name__ == '__main__':
+    print("Registered Routes:")
+    for rule in app.url_map.iter_rules():
+        print(f"{rule.methods} {rule.rule}")
+    
     app.run(port=5000, debug=True)
-
-print("Registered Routes:")
-for rule in app.url_map.iter_rules():
-    print(f"{rule.methods} {rule.rule}")
\ No newline at end of file
@@ -1,34 +1,64 @@
 from flask import Flask
-from flask_sqlalchemy import SQLAlchemy
-from flask_migrate import Migrate
-from flask_jwt_extended import JWTManager
 from flask_cors import CORS
 from config import Config
-
-db = SQLAlchemy()
-migrate = Migrate()
-jwt = JWTManager()
+from application.extensions import db, migrate, jwt
+from application.utils.background import start_background_jobs
+from application.utils.compression import init_compression
+from application.utils.db_routing import init_replicas
+from application.utils.pool_stats import instrument_engines
+from application.utils.rate_limit import init_load_shedding, init_rate_limiting
+from application.utils.sql_instrumentation import init_sql_instrumentation
 
 def create_app(config_class=Config):
     app = Flask(__name__)
     app.config.from_object(config_class)
     
+    # Shed load before doing any other per-request work
+    init_load_shedding(app)
+    
     # Initialize extensions
     db.init_app(app)
+    init_replicas(app)
+    instrument_engines(app)
+    init_sql_instrumentation(app)
     migrate.init_app(app, db)
     jwt.init_app(app)
+    init_compression(app)
+    init_rate_limiting(app)
     
     # Configure CORS
-    CORS(app, resources={r"/*": {"origins": "*"}})
+    CORS(app, resources={r"/*": {"origins": "*"}},
+         expose_headers=['ETag', 'Server-Timing', 'X-Feed-Cursor', 'X-Next-Cursor'])
     
     # Register blueprints
     from application.routes.auth import bp as auth_bp
     from application.routes.jobs import bp as jobs_bp
     from application.routes.swipes import bp as swipes_bp
+    from application.routes.profiles import bp as profiles_bp
+    from application.routes.admin import bp as admin_bp
     
     app.register_blueprint(auth_bp)
     app.register_blueprint(jobs_bp)
     app.register_blueprint(swipes_bp)
+    app.register_blueprint(profiles_bp)
+    app.register_blueprint(admin_bp)
+    
+    # Services with CLI commands and background jobs
+    from application.services import (
+        analytics_service, backfill_service, dedup_service, event_service, feed_service,
+        revocation_service, swipe_service, vector_service
+    )
+    revocation_service.init_app(app)
+    feed_service.init_app(app)
+    analytics_service.init_app(app)
+    swipe_service.init_app(app)
+    dedup_service.init_app(app)
+    vector_service.init_app(app)
+    event_service.init_app(app)
+    backfill_service.init_app(app)
+    
+    if app.config['BACKGROUND_JOBS_ENABLED']:
+        start_background_jobs(app)
     
     @app.route('/health')
     def health_check():
@@ -1,5 +1,10 @@
 from flask_sqlalchemy import SQLAlchemy
+from flask_migrate import Migrate
 from flask_jwt_extended import JWTManager
+from application.utils.db_routing import RoutingSession
 
-db = SQLAlchemy()
-jwt = JWTManager()
\ No newline at end of file
+# The one set of extension instances for the whole process. Import these
+# (or the re-exports in the application package), never create new ones.
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+migrate = Migrate()
+jwt = JWTManager()
@@ -1,7 +1 @@
-from flask_sqlalchemy import SQLAlchemy
-from flask_migrate import Migrate
-from flask_jwt_extended import JWTManager
-
-db = SQLAlchemy()
-migrate = Migrate()
-jwt = JWTManager()
\ No newline at end of file
+from application.extensions import db
@@ -0,0 +1,25 @@
+from application import db
+from datetime import datetime
+
+class BackfillProgress(db.Model):
+    """Checkpoint for one online backfill: every id <= last_id is done."""
+    __tablename__ = 'backfill_progress'
+
+    name = db.Column(db.String(100), primary_key=True)
+    last_id = db.Column(db.Integer, nullable=False, default=0)
+    max_id = db.Column(db.Integer, nullable=False)  # Highest id when the run started
+    rows_updated = db.Column(db.Integer, nullable=False, default=0)
+    started_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    completed_at = db.Column(db.DateTime)
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'last_id': self.last_id,
+            'max_id': self.max_id,
+            'rows_updated': self.rows_updated,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'completed_at': self.completed_at.isoformat() if self.completed_at else None
+        }
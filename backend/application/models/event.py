@@ -0,0 +1,46 @@
+from application import db
+from datetime import datetime
+
+class Event(db.Model):
+    """Append-only outbox row, written in the same transaction as the change.
+
+    The id is the event's offset. Payloads for keyed topics are full
+    snapshots, so compaction can keep only the latest event per key.
+    """
+    __tablename__ = 'events'
+
+    id = db.Column(db.Integer, primary_key=True)
+    topic = db.Column(db.String(50), nullable=False)  # 'job', 'swipe'
+    key = db.Column(db.String(100), nullable=False)  # Job ID, user ID, ...
+    type = db.Column(db.String(50), nullable=False)  # 'job.created', ...
+    payload = db.Column(db.JSON, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
+
+    __table_args__ = (
+        db.Index('ix_events_topic_key_id', 'topic', 'key', 'id'),
+    )
+
+    def to_dict(self):
+        return {
+            'offset': self.id,
+            'topic': self.topic,
+            'key': self.key,
+            'type': self.type,
+            'payload': self.payload,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
+
+class ConsumerOffset(db.Model):
+    """Last event offset a consumer has committed as processed."""
+    __tablename__ = 'consumer_offsets'
+
+    consumer = db.Column(db.String(100), primary_key=True)
+    offset = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'consumer': self.consumer,
+            'offset': self.offset,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
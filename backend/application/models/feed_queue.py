@@ -0,0 +1,15 @@
+from application import db
+from datetime import datetime
+
+class FeedQueue(db.Model):
+    __tablename__ = 'feed_queues'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+
+    # Ranked job IDs and their scores, packed as array('i') / array('f') bytes
+    job_ids = db.Column(db.LargeBinary, nullable=False)
+    scores = db.Column(db.LargeBinary, nullable=False)
+
+    # Bumped on every rebuild or insert so clients can cheaply detect changes
+    generation = db.Column(db.Integer, nullable=False, default=0)
+    built_at = db.Column(db.DateTime, default=datetime.utcnow)
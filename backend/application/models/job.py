@@ -18,12 +18,16 @@ class Job(db.Model):
     
     # Location and work type
     location = db.Column(db.String(100))
+    latitude = db.Column(db.Float)
+    longitude = db.Column(db.Float)
+    geohash = db.Column(db.String(12), index=True)  # Resolved from location
     remote_type = db.Column(db.String(20))  # 'remote', 'hybrid', 'onsite'
     
     # Compensation
     salary_min = db.Column(db.Integer)
     salary_max = db.Column(db.Integer)
     equity_offered = db.Column(db.Boolean, default=False)
+    salary_bucket = db.Column(db.SmallInteger, index=True)  # Histogram bucket of salary_max
     
     # Company info
     company_name = db.Column(db.String(100), nullable=False)
@@ -31,12 +35,22 @@ class Job(db.Model):
     company_size = db.Column(db.String(50))  # e.g., '1-10', '11-50'
     company_funding = db.Column(db.String(50))  # e.g., 'Seed', 'Series A'
     
+    # Near-duplicate detection: MinHash of title + description, and the
+    # earlier posting by the same employer this one repeats
+    minhash = db.Column(db.LargeBinary)
+    duplicate_of_id = db.Column(db.Integer, db.ForeignKey('jobs.id'), index=True)
+    
     # Status and timestamps
     is_active = db.Column(db.Boolean, default=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
     expires_at = db.Column(db.DateTime)
     
+    # Incremented on every UPDATE; stale writes raise StaleDataError
+    version = db.Column(db.Integer, nullable=False, default=1)
+    
+    __mapper_args__ = {'version_id_col': version}
+    
     def to_dict(self):
         return {
             'id': self.id,
@@ -48,6 +62,8 @@ class Job(db.Model):
             'required_skills': self.required_skills.split(',') if self.required_skills else [],
             'preferred_skills': self.preferred_skills.split(',') if self.preferred_skills else [],
             'location': self.location,
+            'latitude': self.latitude,
+            'longitude': self.longitude,
             'remote_type': self.remote_type,
             'salary_min': self.salary_min,
             'salary_max': self.salary_max,
@@ -57,7 +73,9 @@ class Job(db.Model):
             'company_size': self.company_size,
             'company_funding': self.company_funding,
             'is_active': self.is_active,
+            'duplicate_of_id': self.duplicate_of_id,
             'created_at': self.created_at.isoformat() if self.created_at else None,
+            'version': self.version,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None,
             'expires_at': self.expires_at.isoformat() if self.expires_at else None
         }
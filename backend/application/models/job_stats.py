@@ -0,0 +1,40 @@
+from application import db
+from datetime import datetime
+
+# Rollup rows are append-only deltas: the aggregator inserts a new row per
+# (job, bucket) for every batch it processes, and readers sum them.
+
+class JobStatsHourly(db.Model):
+    __tablename__ = 'job_stats_hourly'
+
+    id = db.Column(db.Integer, primary_key=True)
+    job_id = db.Column(db.Integer, db.ForeignKey('jobs.id'), nullable=False)
+    hour = db.Column(db.DateTime, nullable=False)  # Truncated to the hour, UTC
+    views = db.Column(db.Integer, nullable=False, default=0)
+    likes = db.Column(db.Integer, nullable=False, default=0)
+    passes = db.Column(db.Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        db.Index('ix_job_stats_hourly_job_hour', 'job_id', 'hour'),
+    )
+
+class JobStatsDaily(db.Model):
+    __tablename__ = 'job_stats_daily'
+
+    id = db.Column(db.Integer, primary_key=True)
+    job_id = db.Column(db.Integer, db.ForeignKey('jobs.id'), nullable=False)
+    day = db.Column(db.Date, nullable=False)
+    views = db.Column(db.Integer, nullable=False, default=0)
+    likes = db.Column(db.Integer, nullable=False, default=0)
+    passes = db.Column(db.Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        db.Index('ix_job_stats_daily_job_day', 'job_id', 'day'),
+    )
+
+class AggregatorWatermark(db.Model):
+    __tablename__ = 'aggregator_watermarks'
+
+    name = db.Column(db.String(50), primary_key=True)
+    last_id = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -1,12 +1,15 @@
-from app import db
+from application import db
 from datetime import datetime
 from sqlalchemy.dialects.postgresql import ARRAY
 
+# Native arrays on Postgres, JSON lists on SQLite for local development
+StringArray = ARRAY(db.String).with_variant(db.JSON, 'sqlite')
+
 class Profile(db.Model):
     __tablename__ = 'profiles'
     
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
     full_name = db.Column(db.String(100), nullable=False)
     bio = db.Column(db.Text)
     profile_picture_path = db.Column(db.String(255))
@@ -15,25 +18,36 @@ class Profile(db.Model):
     # Professional details
     title = db.Column(db.String(100))
     years_of_experience = db.Column(db.Integer)
-    skills = db.Column(ARRAY(db.String))
+    skills = db.Column(StringArray)
     
     # Preferences
-    preferred_role_types = db.Column(ARRAY(db.String))
-    preferred_locations = db.Column(ARRAY(db.String))
+    preferred_role_types = db.Column(StringArray)
+    preferred_locations = db.Column(StringArray)
     remote_preference = db.Column(db.String(20))  # 'remote', 'hybrid', 'onsite'
     salary_expectation_min = db.Column(db.Integer)
     salary_expectation_max = db.Column(db.Integer)
     
+    # Resolved from the first preferred location
+    latitude = db.Column(db.Float)
+    longitude = db.Column(db.Float)
+    geohash = db.Column(db.String(12), index=True)
+    
     # Timestamps
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    # Incremented on every UPDATE; stale writes raise StaleDataError
+    version = db.Column(db.Integer, nullable=False, default=1)
+    
+    __mapper_args__ = {'version_id_col': version}
+    
     def to_dict(self):
         return {
             'id': self.id,
             'user_id': self.user_id,
             'full_name': self.full_name,
             'bio': self.bio,
+            'profile_picture_path': self.profile_picture_path,
             'title': self.title,
             'years_of_experience': self.years_of_experience,
             'skills': self.skills,
@@ -42,6 +56,9 @@ class Profile(db.Model):
             'remote_preference': self.remote_preference,
             'salary_expectation_min': self.salary_expectation_min,
             'salary_expectation_max': self.salary_expectation_max,
+            'latitude': self.latitude,
+            'longitude': self.longitude,
             'created_at': self.created_at.isoformat(),
+            'version': self.version,
             'updated_at': self.updated_at.isoformat()
         }
\ No newline at end of file
@@ -0,0 +1,12 @@
+from application import db
+from datetime import datetime
+
+class RevokedToken(db.Model):
+    __tablename__ = 'revoked_tokens'
+
+    id = db.Column(db.Integer, primary_key=True)
+    jti = db.Column(db.String(36), unique=True, nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    token_type = db.Column(db.String(10), nullable=False)  # 'access' or 'refresh'
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)  # Prunable after this
+    revoked_at = db.Column(db.DateTime, default=datetime.utcnow)
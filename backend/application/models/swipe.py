@@ -14,6 +14,10 @@ class Swipe(db.Model):
     user = db.relationship('User', backref=db.backref('swipes', lazy=True))
     job = db.relationship('Job', backref=db.backref('swipes', lazy=True))
 
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'job_id', name='uq_swipes_user_job'),
+    )
+
     def to_dict(self):
         return {
             'id': self.id,
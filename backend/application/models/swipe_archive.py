@@ -0,0 +1,24 @@
+from application import db
+from datetime import datetime
+
+class SwipeSummary(db.Model):
+    """Everything a user swiped before their swipes were archived."""
+    __tablename__ = 'swipe_summaries'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    job_ids = db.Column(db.LargeBinary, nullable=False)  # Sorted int32 array
+    total = db.Column(db.Integer, nullable=False, default=0)
+    liked = db.Column(db.Integer, nullable=False, default=0)
+    archived_through = db.Column(db.DateTime)
+
+class SwipeArchive(db.Model):
+    """One compressed columnar file of archived swipes."""
+    __tablename__ = 'swipe_archives'
+
+    id = db.Column(db.Integer, primary_key=True)
+    month = db.Column(db.String(7), nullable=False, index=True)  # 'YYYY-MM'
+    path = db.Column(db.String(255), nullable=False, unique=True)  # Relative to SWIPE_ARCHIVE_PATH
+    min_swipe_id = db.Column(db.Integer, nullable=False)
+    max_swipe_id = db.Column(db.Integer, nullable=False)
+    row_count = db.Column(db.Integer, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
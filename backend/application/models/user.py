@@ -1,7 +1,18 @@
 from application import db
 from datetime import datetime
+import sys
 import bcrypt
 
+def _bcrypt_call(func, *args):
+    # bcrypt holds a CPU for tens of milliseconds. Under gevent that would
+    # stall every greenlet in the worker, so run it on the hub's native
+    # thread pool instead (bcrypt releases the GIL while hashing).
+    if 'gevent' in sys.modules:
+        from gevent import get_hub, monkey
+        if monkey.is_module_patched('threading'):
+            return get_hub().threadpool.apply(func, args)
+    return func(*args)
+
 class User(db.Model):
     __tablename__ = 'users'
     
@@ -11,13 +22,15 @@ class User(db.Model):
     user_type = db.Column(db.String(20), nullable=False)  # 'candidate' or 'employer'
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     last_login = db.Column(db.DateTime, nullable=True)
+    tokens_revoked_before = db.Column(db.DateTime, nullable=True, index=True)  # Set by logout-all
     
     def set_password(self, password):
         salt = bcrypt.gensalt()
-        self.password_hash = bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
+        self.password_hash = _bcrypt_call(bcrypt.hashpw, password.encode('utf-8'), salt).decode('utf-8')
     
     def check_password(self, password):
-        return bcrypt.checkpw(
+        return _bcrypt_call(
+            bcrypt.checkpw,
             password.encode('utf-8'),
             self.password_hash.encode('utf-8')
         )
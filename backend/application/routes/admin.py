@@ -0,0 +1,77 @@
+import hmac
+import os
+from functools import wraps
+
+from flask import Blueprint, abort, current_app, jsonify, request
+
+from application import db
+from application.models.event import ConsumerOffset
+from application.services import event_service
+from application.utils.pool_stats import pool_status
+
+bp = Blueprint('admin', __name__, url_prefix='/api/admin')
+
+def admin_required(f):
+    """Require the X-Admin-Key header; the endpoints don't exist without ADMIN_API_KEY."""
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        expected = current_app.config.get('ADMIN_API_KEY')
+        if not expected:
+            abort(404)
+        provided = request.headers.get('X-Admin-Key', '')
+        if not hmac.compare_digest(provided, expected):
+            return jsonify({'error': 'Unauthorized'}), 401
+        return f(*args, **kwargs)
+    return decorated
+
+@bp.route('/pool', methods=['GET'])
+@admin_required
+def get_pool_status():
+    return jsonify({
+        'pid': os.getpid(),
+        'engines': pool_status(current_app)
+    })
+
+@bp.route('/events', methods=['GET'])
+@admin_required
+def read_events():
+    """Next batch for ?consumer=; commit the returned next_offset when done."""
+    consumer = request.args.get('consumer')
+    if not consumer:
+        return jsonify({'error': 'consumer is required'}), 400
+    limit = min(request.args.get('limit', current_app.config['EVENT_BATCH_SIZE'], type=int), 5000)
+    topics = request.args.get('topics')
+    events, next_offset = event_service.read_batch(
+        consumer, limit, topics.split(',') if topics else None
+    )
+    return jsonify({
+        'events': [event.to_dict() for event in events],
+        'next_offset': next_offset
+    })
+
+@bp.route('/events/commit', methods=['POST'])
+@admin_required
+def commit_events():
+    data = request.get_json(silent=True) or {}
+    if not data.get('consumer') or not isinstance(data.get('offset'), int):
+        return jsonify({'error': 'consumer and integer offset are required'}), 400
+    try:
+        offset = event_service.commit(data['consumer'], data['offset'])
+        return jsonify({'consumer': data['consumer'], 'offset': offset})
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@bp.route('/consumers', methods=['GET'])
+@admin_required
+def get_consumers():
+    return jsonify(event_service.consumer_lag())
+
+@bp.route('/consumers/<consumer>', methods=['DELETE'])
+@admin_required
+def delete_consumer(consumer):
+    """Forget a consumer so it no longer holds back event retention."""
+    row = ConsumerOffset.query.get_or_404(consumer)
+    db.session.delete(row)
+    db.session.commit()
+    return jsonify({'message': 'Consumer removed'})
@@ -2,17 +2,23 @@ from flask import Blueprint, request, jsonify, make_response
 from flask_jwt_extended import (
     create_access_token,
     create_refresh_token,
+    decode_token,
     jwt_required,
+    get_jwt,
     get_jwt_identity
 )
 from application.models.user import User
 from application import db
+from application.services import revocation_service
 from datetime import datetime
 from email_validator import validate_email, EmailNotValidError
+from sqlalchemy.exc import IntegrityError
+from application.utils.rate_limit import rate_limit
 
 bp = Blueprint('auth', __name__, url_prefix='/api/auth')
 
 @bp.route('/login', methods=['POST', 'OPTIONS'])
+@rate_limit('login')
 def login():
     if request.method == 'OPTIONS':
         response = make_response()
@@ -48,6 +54,7 @@ def login():
     return response
 
 @bp.route('/register', methods=['POST', 'OPTIONS'])
+@rate_limit('register')
 def register():
     if request.method == 'OPTIONS':
         response = make_response()
@@ -102,4 +109,65 @@ def register():
         return jsonify({'error': str(e)}), 400
     except Exception as e:
         db.session.rollback()
-        return jsonify({'error': str(e)}), 500
\ No newline at end of file
+        return jsonify({'error': str(e)}), 500
+
+@bp.route('/refresh', methods=['POST'])
+@jwt_required(refresh=True)
+def refresh():
+    current_user_id = get_jwt_identity()
+    
+    # Rotation: each refresh token works once and is swapped for a new pair
+    try:
+        revocation_service.revoke(get_jwt())
+        db.session.commit()
+    except IntegrityError:
+        # Lost a race with another refresh using the same token
+        db.session.rollback()
+        return jsonify({'error': 'Token has been revoked'}), 401
+    revocation_service.sync()
+    
+    return jsonify({
+        'access_token': create_access_token(identity=current_user_id),
+        'refresh_token': create_refresh_token(identity=current_user_id)
+    })
+
+@bp.route('/logout', methods=['POST'])
+@jwt_required(verify_type=False)
+def logout():
+    current_user_id = get_jwt_identity()
+    tokens = [get_jwt()]
+    
+    # Revoke the matching refresh token too when the client sends it
+    refresh_token = (request.get_json(silent=True) or {}).get('refresh_token')
+    if refresh_token:
+        try:
+            payload = decode_token(refresh_token)
+        except Exception:
+            return jsonify({'error': 'Invalid refresh token'}), 400
+        if payload['sub'] != current_user_id:
+            return jsonify({'error': 'Invalid refresh token'}), 400
+        if payload['jti'] != tokens[0]['jti']:
+            tokens.append(payload)
+    
+    try:
+        revocation_service.revoke_unrevoked(tokens)
+        db.session.commit()
+    except IntegrityError:
+        # A concurrent refresh or logout revoked one of them first; the
+        # second pass skips it and still revokes the rest
+        db.session.rollback()
+        revocation_service.revoke_unrevoked(tokens)
+        db.session.commit()
+    revocation_service.sync()
+    
+    return jsonify({'message': 'Logged out successfully'})
+
+@bp.route('/logout-all', methods=['POST'])
+@jwt_required()
+def logout_all():
+    user = User.query.get_or_404(get_jwt_identity())
+    revocation_service.revoke_all(user)
+    db.session.commit()
+    revocation_service.sync()
+    
+    return jsonify({'message': 'Logged out of all sessions'})
@@ -1,17 +1,29 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, current_app, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from flask_cors import cross_origin
 from application import db
 from application.models.job import Job
+from application.services import (
+    analytics_service, dedup_service, event_service, facet_service, feed_service, geo_service,
+    vector_service
+)
+from application.utils.db_routing import read_only
+from application.utils.helpers import check_if_match, make_etag, not_modified
+from sqlalchemy.orm.exc import StaleDataError
 from datetime import datetime, timedelta
+import hashlib
+import numpy as np
 
 bp = Blueprint('jobs', __name__, url_prefix='/api/jobs')
 
+# Edits to any of these change a job's semantic search vector
+VECTOR_FIELDS = {'title', 'description', 'required_skills', 'preferred_skills', 'is_active'}
+
 @bp.after_request
 def after_request(response):
     print(f"After request: {request.method} {request.path}")
     response.headers.add('Access-Control-Allow-Origin', 'http://localhost:3000')
-    response.headers.add('Access-Control-Allow-Headers', 'Content-Type,Authorization')
+    response.headers.add('Access-Control-Allow-Headers', 'Content-Type,Authorization,If-Match,If-None-Match')
     response.headers.add('Access-Control-Allow-Methods', 'GET,PUT,POST,DELETE,OPTIONS')
     response.headers.add('Access-Control-Allow-Credentials', 'true')
     print(f"Response headers: {dict(response.headers)}")
@@ -32,6 +44,16 @@ def validate_job_data(data, required_fields=None):
     
     return None
 
+def check_duplicate(job):
+    duplicate_of_id = dedup_service.check(job)
+    if duplicate_of_id and current_app.config['DUPLICATE_JOB_POLICY'] == 'reject':
+        print(f"Rejected near-duplicate of job {duplicate_of_id}")
+        return jsonify({
+            'error': 'This posting is a near-duplicate of an existing job',
+            'duplicate_of_id': duplicate_of_id
+        }), 409
+    return None
+
 @bp.route('/', methods=['OPTIONS'])
 @cross_origin()
 def handle_options():
@@ -104,9 +126,21 @@ def create_job():
             company_funding=data.get('company_funding'),
             expires_at=expires_at
         )
+        geo_service.apply_location(job, job.location)
+        job.salary_bucket = facet_service.salary_bucket(job.salary_max)
+        
+        duplicate_error = check_duplicate(job)
+        if duplicate_error:
+            return duplicate_error
         
         db.session.add(job)
+        db.session.flush()
+        event_service.record_event('job', job.id, 'job.created', job.to_dict())
         db.session.commit()
+        dedup_service.index_job(job)
+        facet_service.invalidate()
+        feed_service.insert_job(job.id)
+        vector_service.index_job(job.id)
         print(f"Created job with ID: {job.id}")
         
         return jsonify(job.to_dict()), 201
@@ -118,10 +152,23 @@ def create_job():
 
 @bp.route('/<int:job_id>', methods=['GET'])
 @jwt_required()
+@read_only
 def get_job(job_id):
     print(f"GET /jobs/{job_id} endpoint called")
+    
+    # Check the client's cached version before loading the full row
+    version = db.session.query(Job.version).filter_by(id=job_id).scalar()
+    if version is None:
+        return jsonify({'error': 'Job not found'}), 404
+    etag = make_etag('job', job_id, version)
+    cached = not_modified(etag)
+    if cached:
+        return cached
+    
     job = Job.query.get_or_404(job_id)
-    return jsonify(job.to_dict())
+    response = jsonify(job.to_dict())
+    response.headers['ETag'] = make_etag('job', job.id, job.version)
+    return response
 
 @bp.route('/<int:job_id>', methods=['PUT'])
 @jwt_required()
@@ -133,6 +180,10 @@ def update_job(job_id):
     if job.employer_id != current_user_id:
         print(f"Unauthorized update attempt by user {current_user_id}")
         return jsonify({'error': 'Unauthorized'}), 403
+    
+    precondition_error = check_if_match(make_etag('job', job.id, job.version))
+    if precondition_error:
+        return precondition_error
         
     data = request.get_json()
     print(f"Update data: {data}")
@@ -151,13 +202,34 @@ def update_job(job_id):
             data['preferred_skills'] = ','.join(data['preferred_skills'])
             
         for key, value in data.items():
-            if hasattr(job, key) and key != 'id':  # Prevent updating id
+            if hasattr(job, key) and key not in ('id', 'version'):  # Prevent updating id/version
                 setattr(job, key, value)
-                
+        if 'location' in data:
+            geo_service.apply_location(job, job.location)
+        job.salary_bucket = facet_service.salary_bucket(job.salary_max)
+        if 'title' in data or 'description' in data:
+            duplicate_error = check_duplicate(job)
+            if duplicate_error:
+                db.session.rollback()
+                return duplicate_error
+        
+        # Flush first so the event carries the new version
+        db.session.flush()
+        event_service.record_event('job', job.id, 'job.updated', job.to_dict())
         db.session.commit()
+        dedup_service.index_job(job)
+        facet_service.invalidate()
+        if VECTOR_FIELDS.intersection(data):
+            vector_service.index_job(job.id)
         print(f"Successfully updated job {job_id}")
-        return jsonify(job.to_dict())
+        response = jsonify(job.to_dict())
+        response.headers['ETag'] = make_etag('job', job.id, job.version)
+        return response
         
+    except StaleDataError:
+        # Someone else committed between our If-Match check and the UPDATE
+        db.session.rollback()
+        return jsonify({'error': 'Resource has been modified'}), 412
     except Exception as e:
         db.session.rollback()
         print(f"Error updating job: {str(e)}")
@@ -175,31 +247,70 @@ def deactivate_job(job_id):
         return jsonify({'error': 'Unauthorized'}), 403
     
     job.is_active = False
+    db.session.flush()
+    event_service.record_event('job', job.id, 'job.deactivated', job.to_dict())
     db.session.commit()
+    dedup_service.index_job(job)
+    facet_service.invalidate()
+    vector_service.index_job(job.id)
     print(f"Successfully deactivated job {job_id}")
     
     return jsonify({'message': 'Job deactivated successfully'})
 
+@bp.route('/<int:job_id>/analytics', methods=['GET'])
+@jwt_required()
+@read_only
+def get_job_analytics(job_id):
+    print(f"GET /jobs/{job_id}/analytics endpoint called")
+    current_user_id = get_jwt_identity()
+    job = Job.query.get_or_404(job_id)
+    
+    if job.employer_id != current_user_id:
+        print(f"Unauthorized analytics request by user {current_user_id}")
+        return jsonify({'error': 'Unauthorized'}), 403
+    
+    range_name = request.args.get('range', '7d')
+    if range_name not in analytics_service.RANGES:
+        return jsonify({'error': f"range must be one of: {', '.join(analytics_service.RANGES)}"}), 400
+    
+    # Served from the rollup tables only, never from raw swipes
+    return jsonify(analytics_service.job_analytics(job_id, range_name))
+
 @bp.route('/feed', methods=['GET'])
 @jwt_required()
+@read_only
 def get_job_feed():
     print("GET /jobs/feed endpoint called")
     current_user_id = get_jwt_identity()
+    cursor = request.args.get('cursor')
+    limit = min(request.args.get('limit', current_app.config['FEED_PAGE_SIZE'], type=int), 100)
     
-    # Get jobs that:
-    # 1. Are active
-    # 2. Haven't expired
-    # 3. Haven't been swiped on by this user
-    jobs = Job.query.filter(
-        Job.is_active == True,
-        Job.expires_at > datetime.utcnow()
-    ).order_by(Job.created_at.desc()).all()
+    # Served from the user's precomputed, ranked queue; jobs deactivated,
+    # expired or swiped since it was built are skipped while paging. The
+    # tag covers exactly the jobs on the page (and their versions), so an
+    # unchanged page costs a light column query instead of a page build.
+    queue = feed_service.get_queue(current_user_id)
+    rows, next_cursor = feed_service.next_page(current_user_id, cursor, limit, queue=queue)
+    page_key = hashlib.sha1(','.join(
+        f"{row.id}:{row.version}:{row.updated_at.isoformat() if row.updated_at else ''}"
+        for row in rows
+    ).encode()).hexdigest()[:16]
+    etag = make_etag('feed', current_user_id, next_cursor or '', page_key)
+    cached = not_modified(etag)
+    if cached:
+        return cached
     
-    print(f"Found {len(jobs)} jobs for feed")
-    return jsonify([job.to_dict() for job in jobs])
+    jobs = feed_service.load_jobs(rows)
+    print(f"Serving {len(jobs)} jobs for feed")
+    response = jsonify([job.to_dict() for job in jobs])
+    response.headers['ETag'] = etag
+    if next_cursor:
+        response.headers['X-Feed-Cursor'] = next_cursor
+    return response
 
 @bp.route('/search', methods=['GET'])
 @jwt_required()
+@read_only
 def search_jobs():
     print("GET /jobs/search endpoint called")
     # Get search parameters
@@ -207,14 +318,17 @@ def search_jobs():
     location = request.args.get('location')
     remote_type = request.args.get('remote_type')
     min_salary = request.args.get('min_salary', type=int)
+    near = request.args.get('near')
+    facets = request.args.get('facets')
+    semantic = request.args.get('semantic')
     
-    print(f"Search parameters: role_type={role_type}, location={location}, remote_type={remote_type}, min_salary={min_salary}")
+    print(f"Search parameters: role_type={role_type}, location={location}, remote_type={remote_type}, min_salary={min_salary}, near={near}, facets={facets}")
     
     # Build query
-    query = Job.query.filter(
+    query = dedup_service.exclude_collapsed(Job.query.filter(
         Job.is_active == True,
         Job.expires_at > datetime.utcnow()
-    )
+    ))
     
     if role_type:
         query = query.filter(Job.role_type == role_type)
@@ -225,6 +339,118 @@ def search_jobs():
     if min_salary:
         query = query.filter(Job.salary_max >= min_salary)
     
+    facet_names = None
+    if facets:
+        facet_names = facet_service.parse_facets(facets)
+        if facet_names is None:
+            return jsonify({'error': f'Unknown facet; choose from {", ".join(facet_service.FACET_COLUMNS)}'}), 400
+    cache_key = (role_type, location, remote_type, min_salary)
+    
+    if semantic:
+        return search_jobs_semantic(query, semantic, facet_names, cache_key)
+    if near:
+        return search_jobs_near(query, near, facet_names, cache_key)
+    
     jobs = query.order_by(Job.created_at.desc()).all()
     print(f"Found {len(jobs)} jobs matching search criteria")
-    return jsonify([job.to_dict() for job in jobs])
\ No newline at end of file
+    
+    return search_response([job.to_dict() for job in jobs], query, facet_names, cache_key)
+
+def search_response(results, query, facet_names, cache_key):
+    """Results as a bare list, or with facet counts over ``query`` if requested."""
+    if not facet_names:
+        return jsonify(results)
+    return jsonify({
+        'results': results,
+        'facets': facet_service.facet_counts(query, facet_names, cache_key)
+    })
+
+def search_jobs_semantic(query, text, facet_names, cache_key):
+    limit = min(request.args.get('limit', 20, type=int), 100)
+    
+    # Over-fetch so the filters applied afterwards still leave a full page
+    matches = vector_service.search(text, limit * 5)
+    # Facets count the whole over-fetched candidate set, not just this page
+    query = query.filter(Job.id.in_([job_id for job_id, _ in matches]))
+    cache_key = cache_key + ('semantic', text)
+    if not matches:
+        return search_response([], query, facet_names, cache_key)
+    
+    jobs_by_id = {job.id: job for job in query}
+    result = []
+    for job_id, score in matches:
+        job = jobs_by_id.get(job_id)
+        if job is None:
+            continue
+        job_dict = job.to_dict()
+        job_dict['score'] = round(score, 4)
+        result.append(job_dict)
+        if len(result) == limit:
+            break
+    
+    print(f"Found {len(result)} jobs semantically matching '{text}'")
+    return search_response(result, query, facet_names, cache_key)
+
+def search_jobs_near(query, near, facet_names, cache_key):
+    point = geo_service.parse_point(near)
+    if point is None:
+        return jsonify({'error': 'near must be "lat,lon"'}), 400
+    lat, lon = point
+    radius_km = min(request.args.get('radius_km', 25, type=float), 500)
+    limit = request.args.get('limit', 50, type=int)
+    if limit < 1:
+        return jsonify({'error': 'limit must be a positive integer'}), 400
+    limit = min(limit, 200)
+    
+    # Keyset cursor from the previous page: "<distance_km>:<job_id>"
+    after = request.args.get('after')
+    after_key = None
+    if after:
+        try:
+            after_distance, after_id = after.split(':')
+            after_key = (float(after_distance), int(after_id))
+        except ValueError:
+            return jsonify({'error': 'Invalid cursor'}), 400
+    
+    # Cheap prefilter on the geohash index, then exact distances in one pass
+    cells = geo_service.covering_cells(lat, lon, radius_km)
+    if cells:
+        # Base32 geohash chars sort below '~', so each prefix is a range scan
+        query = query.filter(db.or_(*[
+            db.and_(Job.geohash >= cell, Job.geohash < cell + '~') for cell in cells
+        ]))
+    else:
+        query = query.filter(Job.geohash.isnot(None))
+    
+    rows = query.with_entities(Job.id, Job.latitude, Job.longitude).all()
+    cache_key = cache_key + ('near', lat, lon, radius_km)
+    if not rows:
+        return search_response([], query, facet_names, cache_key)
+    
+    ids = np.array([row[0] for row in rows], dtype=np.int64)
+    distances = geo_service.haversine_km(
+        lat, lon, [row[1] for row in rows], [row[2] for row in rows]
+    )
+    mask = distances <= radius_km
+    # Facets count every job within the radius, not just this page
+    facet_query = query.filter(Job.id.in_(ids[mask].tolist())) if facet_names else None
+    if after_key:
+        mask &= (distances > after_key[0]) | ((distances == after_key[0]) & (ids > after_key[1]))
+    ids, distances = ids[mask], distances[mask]
+    
+    order = np.lexsort((ids, distances))[:limit]
+    page = [(int(ids[i]), float(distances[i])) for i in order]
+    
+    jobs_by_id = {job.id: job for job in Job.query.filter(Job.id.in_([job_id for job_id, _ in page]))}
+    result = []
+    for job_id, distance in page:
+        job_dict = jobs_by_id[job_id].to_dict()
+        job_dict['distance_km'] = round(distance, 2)
+        result.append(job_dict)
+    
+    print(f"Found {len(result)} jobs within {radius_km}km of {lat},{lon}")
+    response = search_response(result, facet_query, facet_names, cache_key)
+    if len(page) == limit:
+        last_id, last_distance = page[-1]
+        response.headers['X-Next-Cursor'] = f'{last_distance!r}:{last_id}'
+    return response
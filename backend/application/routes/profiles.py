@@ -1,7 +1,13 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, current_app, request, jsonify, send_file
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from app import db
-from app.models.profile import Profile
+from application import db
+from application.models.profile import Profile
+from application.models.user import User
+from application.services import geo_service, picture_service, profile_service
+from application.utils.db_routing import read_only
+from application.utils.images import InvalidImage
+from application.utils.helpers import check_if_match, make_etag, not_modified
+from sqlalchemy.orm.exc import StaleDataError
 import os
 
 bp = Blueprint('profiles', __name__, url_prefix='/api/profiles')
@@ -30,9 +36,11 @@ def create_profile():
             salary_expectation_min=data.get('salary_expectation_min'),
             salary_expectation_max=data.get('salary_expectation_max')
         )
+        geo_service.apply_location(profile, (profile.preferred_locations or [None])[0])
         
         db.session.add(profile)
         db.session.commit()
+        profile_service.invalidate(current_user_id)
         
         return jsonify(profile.to_dict()), 201
         
@@ -46,12 +54,47 @@ def create_profile():
 @jwt_required()
 def get_profile():
     current_user_id = get_jwt_identity()
-    profile = Profile.query.filter_by(user_id=current_user_id).first()
     
-    if not profile:
+    # The ETag comes from the primary, not the per-process cache, so an
+    # update made through another worker is seen straight away
+    row = db.session.query(Profile.id, Profile.version).filter_by(user_id=current_user_id).first()
+    if row is None:
         return jsonify({'error': 'Profile not found'}), 404
-        
-    return jsonify(profile.to_dict())
+    cached = not_modified(make_etag('profile', row.id, row.version))
+    if cached:
+        return cached
+    
+    profile = profile_service.get_profile(current_user_id)
+    if profile is None or profile['version'] != row.version:
+        profile_service.invalidate(current_user_id)
+        profile = profile_service.get_profile(current_user_id)
+        if profile is None:
+            return jsonify({'error': 'Profile not found'}), 404
+    response = jsonify(profile)
+    response.headers['ETag'] = make_etag('profile', profile['id'], profile['version'])
+    return response
+
+@bp.route('/bulk', methods=['POST'])
+@jwt_required()
+@read_only
+def get_profiles_bulk():
+    current_user = db.session.get(User, get_jwt_identity())
+    if not current_user or current_user.user_type != 'employer':
+        return jsonify({'error': 'Only employers can look up candidate profiles'}), 403
+    
+    user_ids = (request.get_json(silent=True) or {}).get('user_ids')
+    if not isinstance(user_ids, list) or not all(isinstance(user_id, int) for user_id in user_ids):
+        return jsonify({'error': 'user_ids must be a list of integers'}), 400
+    max_ids = current_app.config['PROFILE_BULK_MAX_IDS']
+    if len(user_ids) > max_ids:
+        return jsonify({'error': f'At most {max_ids} user_ids per request'}), 400
+    
+    user_ids = list(dict.fromkeys(user_ids))
+    profiles = profile_service.get_profiles(user_ids)
+    return jsonify({
+        'profiles': [profiles[user_id] for user_id in user_ids if user_id in profiles],
+        'missing': [user_id for user_id in user_ids if user_id not in profiles]
+    })
 
 @bp.route('/', methods=['PUT'])
 @jwt_required()
@@ -61,17 +104,30 @@ def update_profile():
     
     if not profile:
         return jsonify({'error': 'Profile not found'}), 404
+    
+    precondition_error = check_if_match(make_etag('profile', profile.id, profile.version))
+    if precondition_error:
+        return precondition_error
         
     data = request.get_json()
     
     try:
         for key, value in data.items():
-            if hasattr(profile, key):
+            if hasattr(profile, key) and key not in ('id', 'user_id', 'version'):
                 setattr(profile, key, value)
+        if 'preferred_locations' in data:
+            geo_service.apply_location(profile, (profile.preferred_locations or [None])[0])
                 
         db.session.commit()
-        return jsonify(profile.to_dict())
+        profile_service.invalidate(current_user_id)
+        response = jsonify(profile.to_dict())
+        response.headers['ETag'] = make_etag('profile', profile.id, profile.version)
+        return response
         
+    except StaleDataError:
+        # Someone else committed between our If-Match check and the UPDATE
+        db.session.rollback()
+        return jsonify({'error': 'Resource has been modified'}), 412
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
@@ -101,8 +157,60 @@ def upload_resume():
         if profile:
             profile.resume_path = file_path
             db.session.commit()
+            profile_service.invalidate(profile.user_id)
             
         return jsonify({'message': 'Resume uploaded successfully', 'path': file_path})
         
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
\ No newline at end of file
+        return jsonify({'error': str(e)}), 500
+
+@bp.route('/upload/picture', methods=['POST'])
+@jwt_required()
+def upload_picture():
+    current_user_id = get_jwt_identity()
+    if 'file' not in request.files:
+        return jsonify({'error': 'No file provided'}), 400
+        
+    file = request.files['file']
+    if file.filename == '':
+        return jsonify({'error': 'No file selected'}), 400
+    
+    profile = Profile.query.filter_by(user_id=current_user_id).first()
+    if not profile:
+        return jsonify({'error': 'Profile not found'}), 404
+    
+    max_bytes = current_app.config['PICTURE_MAX_BYTES']
+    data = file.read(max_bytes + 1)
+    if len(data) > max_bytes:
+        return jsonify({'error': f'Picture must be at most {max_bytes // (1024 * 1024)} MB'}), 413
+    
+    try:
+        # Decoding and resizing run in a worker pool, off the request thread
+        digest = picture_service.process(data)
+        
+        profile.profile_picture_path = digest
+        db.session.commit()
+        profile_service.invalidate(current_user_id)
+        
+        return jsonify({
+            'message': 'Picture uploaded successfully',
+            'profile_picture_path': digest,
+            'urls': picture_service.urls(digest)
+        })
+        
+    except InvalidImage as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@bp.route('/pictures/<digest>/<variant>.jpg', methods=['GET'])
+def get_picture(digest, variant):
+    path = picture_service.path_for(digest, variant)
+    if path is None:
+        return jsonify({'error': 'Picture not found'}), 404
+    
+    # Content-addressed, so a URL's bytes never change
+    response = send_file(path, mimetype='image/jpeg', max_age=31536000)
+    response.cache_control.immutable = True
+    return response
@@ -1,7 +1,12 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, current_app, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy.exc import IntegrityError
+from application.models.job import Job
 from application.models.swipe import Swipe
 from application import db
+from application.services import event_service, feed_service, swipe_service
+from application.utils.db_routing import read_only
+from application.utils.rate_limit import rate_limit
 
 bp = Blueprint('swipes', __name__, url_prefix='/api/swipes')
 
@@ -10,10 +15,19 @@ def validate_swipe_data(data):
     missing_fields = [field for field in required_fields if field not in data]
     if missing_fields:
         return {'error': f'Missing required fields: {", ".join(missing_fields)}'}, 400
+    if not isinstance(data['job_id'], int) or isinstance(data['job_id'], bool):
+        return {'error': 'job_id must be an integer'}, 400
     return None
 
+def swipe_count():
+    """Rate-limit cost of a POST /next body: one token per swipe."""
+    data = request.get_json(silent=True) or {}
+    swipes = data.get('swipes') if isinstance(data, dict) else None
+    return len(swipes) if isinstance(swipes, list) and swipes else 1
+
 @bp.route('/', methods=['POST'])
 @jwt_required()
+@rate_limit('swipe')
 def create_swipe():
     current_user_id = get_jwt_identity()
     data = request.get_json()
@@ -24,13 +38,8 @@ def create_swipe():
         return validation_error
 
     try:
-        # Check if swipe already exists
-        existing_swipe = Swipe.query.filter_by(
-            user_id=current_user_id,
-            job_id=data['job_id']
-        ).first()
-
-        if existing_swipe:
+        # Check if swipe already exists, including archived swipes
+        if swipe_service.has_swiped(current_user_id, data['job_id']):
             return jsonify({'error': 'Already swiped on this job'}), 400
 
         # Create new swipe
@@ -41,25 +50,112 @@ def create_swipe():
         )
         
         db.session.add(swipe)
+        event_service.record_event('swipe', current_user_id, 'swipe.created', {
+            'user_id': current_user_id,
+            'job_id': swipe.job_id,
+            'liked': swipe.liked
+        })
         db.session.commit()
         
         return jsonify(swipe.to_dict()), 201
         
+    except IntegrityError:
+        # A concurrent request recorded the same swipe first
+        db.session.rollback()
+        return jsonify({'error': 'Already swiped on this job'}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+def record_swipes(user_id, swipes, job_ids):
+    """Insert the batch's new swipes and their events, and commit.
+
+    Returns the inserted rows and the job IDs skipped as already swiped.
+    """
+    # Retried requests must not double-count, so repeats are skipped
+    # rather than failing the batch
+    skipped = swipe_service.already_swiped(user_id, job_ids)
+    swiped = set(skipped)
+    rows = []
+    for swipe_data in swipes:
+        if swipe_data['job_id'] in swiped:
+            continue
+        swiped.add(swipe_data['job_id'])
+        rows.append({
+            'user_id': user_id,
+            'job_id': swipe_data['job_id'],
+            'liked': bool(swipe_data['liked'])
+        })
+    # One executemany rather than an INSERT ... RETURNING per swipe
+    if rows:
+        db.session.execute(db.insert(Swipe), rows)
+        event_service.record_events('swipe', 'swipe.created', [(user_id, row) for row in rows])
+    db.session.commit()
+    return rows, skipped
+
+@bp.route('/next', methods=['POST'])
+@jwt_required()
+@rate_limit('swipe', cost=swipe_count)
+def swipe_and_next():
+    """Record one swipe (or a small batch) and return the next cards.
+    
+    Body: {"job_id", "liked"} or {"swipes": [{"job_id", "liked"}, ...]},
+    plus the "cursor" from the previous response and an optional "limit".
+    """
+    current_user_id = get_jwt_identity()
+    data = request.get_json(silent=True) or {}
+    
+    swipes = data['swipes'] if 'swipes' in data else [data]
+    if not isinstance(swipes, list) or not swipes or not all(isinstance(s, dict) for s in swipes):
+        return jsonify({'error': 'swipes must be a non-empty list'}), 400
+    max_batch = current_app.config['SWIPE_BATCH_MAX']
+    if len(swipes) > max_batch:
+        return jsonify({'error': f'At most {max_batch} swipes per request'}), 400
+    for swipe_data in swipes:
+        validation_error = validate_swipe_data(swipe_data)
+        if validation_error:
+            return validation_error
+    limit = data.get('limit', current_app.config['FEED_PAGE_SIZE'])
+    if not isinstance(limit, int) or limit < 0:
+        return jsonify({'error': 'limit must be a non-negative integer'}), 400
+    limit = min(limit, 100)
+    
+    try:
+        job_ids = list(dict.fromkeys(swipe_data['job_id'] for swipe_data in swipes))
+        known = {row[0] for row in db.session.query(Job.id).filter(Job.id.in_(job_ids))}
+        unknown = [job_id for job_id in job_ids if job_id not in known]
+        if unknown:
+            return jsonify({'error': 'Job not found', 'job_ids': unknown}), 404
+        
+        try:
+            rows, skipped = record_swipes(current_user_id, swipes, job_ids)
+        except IntegrityError:
+            # A concurrent retry committed some of these first; on the
+            # second pass they show up as already swiped
+            db.session.rollback()
+            rows, skipped = record_swipes(current_user_id, swipes, job_ids)
+        
+        # Committed above, so the swipes just made are already skipped
+        cards, cursor = feed_service.next_cards(current_user_id, data.get('cursor'), limit)
+        return jsonify({
+            'recorded': [row['job_id'] for row in rows],
+            'skipped': sorted(skipped),
+            'cards': [job.to_dict() for job in cards],
+            'cursor': cursor
+        })
+        
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
 @bp.route('/stats', methods=['GET'])
 @jwt_required()
+@read_only
 def get_swipe_stats():
     """Get swipe statistics for the current user"""
     current_user_id = get_jwt_identity()
     
-    total_swipes = Swipe.query.filter_by(user_id=current_user_id).count()
-    liked_jobs = Swipe.query.filter_by(
-        user_id=current_user_id,
-        liked=True
-    ).count()
+    total_swipes, liked_jobs = swipe_service.swipe_counts(current_user_id)
     
     return jsonify({
         'total_swipes': total_swipes,
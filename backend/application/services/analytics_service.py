@@ -0,0 +1,195 @@
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+
+from application import db
+from application.models.job_stats import AggregatorWatermark, JobStatsDaily, JobStatsHourly
+from application.models.swipe import Swipe
+from application.utils.background import register_periodic
+
+analytics_cli = AppGroup('analytics', help='Maintain job analytics rollups.')
+
+WATERMARK = 'job_stats_hourly'
+
+RANGES = {
+    '24h': (timedelta(hours=24), 'hour'),
+    '7d': (timedelta(days=7), 'hour'),
+    '30d': (timedelta(days=30), 'day'),
+    '90d': (timedelta(days=90), 'day'),
+}
+
+
+def _get_watermark():
+    watermark = (AggregatorWatermark.query
+                 .filter_by(name=WATERMARK)
+                 .with_for_update()
+                 .first())
+    if watermark is None:
+        watermark = AggregatorWatermark(name=WATERMARK, last_id=0)
+        db.session.add(watermark)
+    return watermark
+
+
+def _aggregate_batch(batch_size, settled_before):
+    watermark = _get_watermark()
+    rows = (db.session.query(Swipe.id, Swipe.job_id, Swipe.liked, Swipe.created_at)
+            .filter(Swipe.id > watermark.last_id)
+            .order_by(Swipe.id)
+            .limit(batch_size)
+            .all())
+
+    # IDs can commit out of order under concurrency; stop at the first swipe
+    # that is too recent so a slower, lower-ID transaction can't be skipped.
+    settled = []
+    for row in rows:
+        if row.created_at and row.created_at >= settled_before:
+            break
+        settled.append(row)
+    if not settled:
+        db.session.rollback()
+        return 0
+
+    buckets = defaultdict(lambda: [0, 0])
+    for row in settled:
+        hour = (row.created_at or settled_before).replace(minute=0, second=0, microsecond=0)
+        counts = buckets[(row.job_id, hour)]
+        counts[0 if row.liked else 1] += 1
+
+    db.session.add_all(
+        JobStatsHourly(job_id=job_id, hour=hour, views=likes + passes, likes=likes, passes=passes)
+        for (job_id, hour), (likes, passes) in buckets.items()
+    )
+    # Rollup rows and the new watermark commit together, so each swipe is
+    # counted exactly once even if the aggregator dies mid-run.
+    watermark.last_id = settled[-1].id
+    db.session.commit()
+    return len(settled)
+
+
+def aggregate():
+    """Fold swipes past the watermark into hourly rollup rows."""
+    batch_size = current_app.config['ANALYTICS_BATCH_SIZE']
+    settled_before = datetime.utcnow() - timedelta(seconds=current_app.config['ANALYTICS_SETTLE_SECONDS'])
+    total = 0
+    while True:
+        processed = _aggregate_batch(batch_size, settled_before)
+        total += processed
+        if processed < batch_size:
+            return total
+
+
+def compact():
+    """Move hourly rows older than the retention window into daily rows."""
+    cutoff = datetime.utcnow() - timedelta(days=current_app.config['ANALYTICS_HOURLY_RETENTION_DAYS'])
+    cutoff = cutoff.replace(hour=0, minute=0, second=0, microsecond=0)
+    batch_size = current_app.config['ANALYTICS_BATCH_SIZE']
+    total = 0
+    while True:
+        rows = (JobStatsHourly.query
+                .filter(JobStatsHourly.hour < cutoff)
+                .order_by(JobStatsHourly.id)
+                .limit(batch_size)
+                .all())
+        if not rows:
+            return total
+
+        days = defaultdict(lambda: [0, 0, 0])
+        for row in rows:
+            counts = days[(row.job_id, row.hour.date())]
+            counts[0] += row.views
+            counts[1] += row.likes
+            counts[2] += row.passes
+
+        db.session.add_all(
+            JobStatsDaily(job_id=job_id, day=day, views=views, likes=likes, passes=passes)
+            for (job_id, day), (views, likes, passes) in days.items()
+        )
+        JobStatsHourly.query.filter(
+            JobStatsHourly.id.in_([row.id for row in rows])
+        ).delete(synchronize_session=False)
+        db.session.commit()
+        total += len(rows)
+
+
+def job_analytics(job_id, range_name, now=None):
+    """Views/likes/passes for one job over a range, read only from rollups.
+
+    Only whole hours and days inside the range are counted. A daily row
+    can't be split, so the day the range starts in comes from whatever
+    hourly rows it still has.
+    """
+    span, granularity = RANGES[range_name]
+    now = now or datetime.utcnow()
+    start = now - span
+    first_full_day = start.date()
+    if start.time() != datetime.min.time():
+        first_full_day += timedelta(days=1)
+
+    series = defaultdict(lambda: [0, 0, 0])
+    hourly = (db.session.query(
+                JobStatsHourly.hour,
+                db.func.sum(JobStatsHourly.views),
+                db.func.sum(JobStatsHourly.likes),
+                db.func.sum(JobStatsHourly.passes))
+              .filter(JobStatsHourly.job_id == job_id, JobStatsHourly.hour >= start)
+              .group_by(JobStatsHourly.hour)
+              .all())
+    for hour, views, likes, passes in hourly:
+        bucket = hour if granularity == 'hour' else hour.date()
+        counts = series[bucket]
+        counts[0] += views
+        counts[1] += likes
+        counts[2] += passes
+
+    daily = (db.session.query(
+                JobStatsDaily.day,
+                db.func.sum(JobStatsDaily.views),
+                db.func.sum(JobStatsDaily.likes),
+                db.func.sum(JobStatsDaily.passes))
+             .filter(JobStatsDaily.job_id == job_id, JobStatsDaily.day >= first_full_day)
+             .group_by(JobStatsDaily.day)
+             .all())
+    for day, views, likes, passes in daily:
+        # Compacted days have no hourly breakdown left; report them at midnight
+        bucket = day if granularity == 'day' else datetime.combine(day, datetime.min.time())
+        counts = series[bucket]
+        counts[0] += views
+        counts[1] += likes
+        counts[2] += passes
+
+    points = [
+        {'bucket': bucket.isoformat(), 'views': v, 'likes': l, 'passes': p}
+        for bucket, (v, l, p) in sorted(series.items())
+    ]
+    return {
+        'job_id': job_id,
+        'range': range_name,
+        'granularity': granularity,
+        'totals': {
+            'views': sum(point['views'] for point in points),
+            'likes': sum(point['likes'] for point in points),
+            'passes': sum(point['passes'] for point in points),
+        },
+        'series': points,
+    }
+
+
+@analytics_cli.command('aggregate')
+def aggregate_command():
+    """Roll new swipes into hourly stats."""
+    click.echo(f'Aggregated {aggregate()} swipes')
+
+
+@analytics_cli.command('compact')
+def compact_command():
+    """Compact old hourly stats into daily stats."""
+    click.echo(f'Compacted {compact()} hourly rows')
+
+
+def init_app(app):
+    app.cli.add_command(analytics_cli)
+    register_periodic(app, 'analytics-aggregate', app.config['ANALYTICS_AGGREGATE_INTERVAL'], aggregate)
+    register_periodic(app, 'analytics-compact', app.config['ANALYTICS_COMPACT_INTERVAL'], compact)
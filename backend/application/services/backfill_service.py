@@ -0,0 +1,285 @@
+import math
+import time
+from datetime import datetime
+from types import SimpleNamespace
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from sqlalchemy.exc import OperationalError
+
+from application import db
+from application.models.backfill_progress import BackfillProgress
+from application.models.job import Job
+from application.models.profile import Profile
+from application.services import dedup_service, facet_service, geo_service
+from application.utils.db_routing import replica_lag
+
+backfill_cli = AppGroup('backfill', help='Run online, resumable data backfills.')
+
+BACKFILLS = {}
+
+
+class BackfillConflict(RuntimeError):
+    pass
+
+
+class Backfill:
+    """A rewrite of derived columns over one table, a primary key range at a time.
+
+    ``transform`` gets a row with ``id`` and ``columns`` and returns the new
+    column values, or None to leave the row alone. ``pending`` narrows each
+    range to rows that still need work, so reruns are cheap.
+    """
+
+    def __init__(self, name, model, columns, transform, pending=None, description=''):
+        self.name = name
+        self.model = model
+        self.columns = columns
+        self.transform = transform
+        self.pending = pending
+        self.description = description
+
+
+def register(backfill):
+    BACKFILLS[backfill.name] = backfill
+    return backfill
+
+
+def _apply(backfill, lo, hi):
+    """Rewrite pending rows with lo < id <= hi; returns how many changed."""
+    model = backfill.model
+    query = db.select(model.id, *backfill.columns).where(model.id > lo, model.id <= hi)
+    if backfill.pending is not None:
+        query = query.where(backfill.pending)
+
+    updates = []
+    for row in db.session.execute(query):
+        values = backfill.transform(row)
+        if values is not None:
+            update = {f'new_{key}': value for key, value in values.items()}
+            update.update({f'old_{column.key}': getattr(row, column.key) for column in backfill.columns})
+            updates.append(dict(update, row_id=row.id))
+    if not updates:
+        return 0
+
+    # One executemany through Core: no ORM objects, and the version column
+    # is left alone so in-flight edits don't fail with 412 over derived data.
+    # A row edited since the read no longer matches its old source values
+    # and is skipped; the edit already wrote its own derived columns.
+    table = model.__table__
+    columns = [key[len('new_'):] for key in updates[0] if key.startswith('new_')]
+    statement = table.update().where(table.c.id == db.bindparam('row_id'))
+    for column in backfill.columns:
+        statement = statement.where(table.c[column.key].is_not_distinct_from(
+            db.bindparam(f'old_{column.key}', type_=table.c[column.key].type)
+        ))
+    if backfill.pending is not None:
+        statement = statement.where(backfill.pending)
+    result = db.session.execute(
+        statement.values({column: db.bindparam(f'new_{column}') for column in columns}),
+        updates
+    )
+    if db.session.get_bind().dialect.supports_sane_multi_rowcount:
+        return result.rowcount
+    return len(updates)
+
+
+def _set_lock_timeout():
+    # Fail fast instead of queueing behind (and in front of) app writes.
+    # SQLite has no equivalent; there the busy timeout raises instead.
+    if db.session.get_bind().dialect.name == 'postgresql':
+        timeout = int(current_app.config['BACKFILL_LOCK_TIMEOUT_MS'])
+        db.session.execute(db.text(f'SET LOCAL lock_timeout = {timeout}'))
+
+
+def _run_batch(backfill, lo, hi):
+    """One range and its checkpoint, committed together."""
+    _set_lock_timeout()
+    updated = _apply(backfill, lo, hi)
+    moved = db.session.execute(
+        db.update(BackfillProgress)
+        .where(BackfillProgress.name == backfill.name, BackfillProgress.last_id == lo)
+        .values(last_id=hi, rows_updated=BackfillProgress.rows_updated + updated)
+    ).rowcount
+    if moved != 1:
+        db.session.rollback()
+        raise BackfillConflict(f'{backfill.name} was advanced by another runner')
+    db.session.commit()
+    return updated
+
+
+def _wait_for_replicas(echo):
+    max_lag = current_app.config['BACKFILL_MAX_REPLICA_LAG']
+    while True:
+        lag = replica_lag(current_app)
+        if lag <= max_lag:
+            return
+        echo(f'Replica lag {lag:.1f}s > {max_lag}s, waiting')
+        time.sleep(current_app.config['BACKFILL_LAG_POLL_SECONDS'])
+
+
+def _start(backfill, restart):
+    progress = db.session.get(BackfillProgress, backfill.name)
+    if progress is None or restart:
+        # Rows inserted after this are written by the app with the new
+        # columns already, so the range stops at today's highest id
+        max_id = db.session.query(db.func.max(backfill.model.id)).scalar() or 0
+        if progress is None:
+            progress = BackfillProgress(name=backfill.name)
+            db.session.add(progress)
+        progress.max_id = max_id
+        progress.last_id = 0
+        progress.rows_updated = 0
+        progress.started_at = datetime.utcnow()
+        progress.completed_at = None
+        db.session.commit()
+    return progress
+
+
+def run(name, batch_size=None, restart=False, echo=lambda message: None):
+    """Run (or resume) a backfill to completion; returns rows updated.
+
+    Each batch commits with its checkpoint, so an interrupted run picks up
+    after the last committed range. Between batches it sleeps
+    BACKFILL_PAUSE_SECONDS plus BACKFILL_NICE_RATIO of the batch's own run
+    time, and waits while replicas lag. Lock timeouts halve the batch;
+    each batch that commits doubles it back toward the requested size.
+    """
+    config = current_app.config
+    backfill = BACKFILLS[name]
+    target_size = batch_size = batch_size or config['BACKFILL_BATCH_SIZE']
+    progress = _start(backfill, restart)
+    last_id, max_id = progress.last_id, progress.max_id
+    failures = 0
+
+    while last_id < max_id:
+        _wait_for_replicas(echo)
+        hi = min(last_id + batch_size, max_id)
+        started = time.monotonic()
+        try:
+            updated = _run_batch(backfill, last_id, hi)
+        except OperationalError as e:
+            db.session.rollback()
+            failures += 1
+            if failures > config['BACKFILL_MAX_RETRIES']:
+                raise
+            batch_size = max(1, batch_size // 2)
+            echo(f'Batch ({last_id}, {hi}] failed ({e.orig}), retrying with {batch_size} ids')
+            time.sleep(config['BACKFILL_RETRY_SECONDS'] * 2 ** (failures - 1))
+            continue
+        failures = 0
+        batch_size = min(target_size, batch_size * 2)
+        elapsed = time.monotonic() - started
+        last_id = hi
+        echo(f'{name}: {last_id}/{max_id} ids, {updated} rows in {elapsed * 1000:.0f} ms')
+        time.sleep(config['BACKFILL_PAUSE_SECONDS'] + elapsed * config['BACKFILL_NICE_RATIO'])
+
+    progress = db.session.get(BackfillProgress, name, populate_existing=True)
+    if progress.completed_at is None:
+        progress.completed_at = datetime.utcnow()
+        db.session.commit()
+    return progress.rows_updated
+
+
+def estimate(name, batch_size=None):
+    """Dry run: count pending rows and time one sample batch, rolled back."""
+    config = current_app.config
+    backfill = BACKFILLS[name]
+    batch_size = batch_size or config['BACKFILL_BATCH_SIZE']
+    progress = db.session.get(BackfillProgress, name)
+    start = progress.last_id if progress and progress.completed_at is None else 0
+    max_id = db.session.query(db.func.max(backfill.model.id)).scalar() or 0
+
+    pending = db.session.query(db.func.count(backfill.model.id)).filter(backfill.model.id > start)
+    if backfill.pending is not None:
+        pending = pending.filter(backfill.pending)
+    pending_rows = pending.scalar()
+
+    started = time.monotonic()
+    sample_rows = _apply(backfill, start, min(start + batch_size, max_id))
+    sample_seconds = time.monotonic() - started
+    db.session.rollback()
+
+    batches = math.ceil(max(max_id - start, 0) / batch_size)
+    per_batch = sample_seconds * (1 + config['BACKFILL_NICE_RATIO']) + config['BACKFILL_PAUSE_SECONDS']
+    return {
+        'name': name,
+        'id_range': [start, max_id],
+        'pending_rows': pending_rows,
+        'batches': batches,
+        'sample_rows': sample_rows,
+        'sample_seconds': sample_seconds,
+        'estimated_seconds': batches * per_batch,
+    }
+
+
+def _geocoded(location):
+    target = SimpleNamespace()
+    geo_service.apply_location(target, location)
+    return vars(target) if target.latitude is not None else None
+
+
+def _signed(row):
+    sig = dedup_service.signature(row.title, row.description)
+    return {'minhash': sig.tobytes()} if sig is not None else None
+
+
+register(Backfill(
+    'job_geo', Job, [Job.location],
+    lambda row: _geocoded(row.location),
+    pending=db.and_(Job.location.isnot(None), Job.latitude.is_(None)),
+    description='Geocode job locations into latitude/longitude/geohash'
+))
+register(Backfill(
+    'profile_geo', Profile, [Profile.preferred_locations],
+    lambda row: _geocoded((row.preferred_locations or [None])[0]),
+    pending=db.and_(Profile.preferred_locations.isnot(None), Profile.latitude.is_(None)),
+    description='Geocode the first preferred location of each profile'
+))
+register(Backfill(
+    'job_salary_bucket', Job, [Job.salary_max],
+    lambda row: {'salary_bucket': facet_service.salary_bucket(row.salary_max)},
+    pending=db.and_(Job.salary_max.isnot(None), Job.salary_bucket.is_(None)),
+    description='Bucket salary_max for search facets'
+))
+register(Backfill(
+    'job_minhash', Job, [Job.title, Job.description], _signed,
+    pending=Job.minhash.is_(None),
+    description='MinHash signatures for duplicate detection (run `flask jobs dedup` after)'
+))
+
+
+@backfill_cli.command('list')
+def list_command():
+    """Show registered backfills and their progress."""
+    for name, backfill in BACKFILLS.items():
+        progress = db.session.get(BackfillProgress, name)
+        if progress is None:
+            status = 'not started'
+        elif progress.completed_at:
+            status = f'done, {progress.rows_updated} rows'
+        else:
+            status = f'at id {progress.last_id}/{progress.max_id}, {progress.rows_updated} rows'
+        click.echo(f'{name:<20}{status:<36}{backfill.description}')
+
+
+@backfill_cli.command('run')
+@click.argument('name', type=click.Choice(sorted(BACKFILLS)))
+@click.option('--batch-size', type=int, help='Ids per batch (default BACKFILL_BATCH_SIZE).')
+@click.option('--dry-run', is_flag=True, help='Estimate rows and duration without writing.')
+@click.option('--restart', is_flag=True, help='Start over instead of resuming.')
+def run_command(name, batch_size, dry_run, restart):
+    """Run or resume a backfill."""
+    if dry_run:
+        result = estimate(name, batch_size)
+        click.echo(f"{result['pending_rows']} rows pending in ids {result['id_range'][0]}-"
+                   f"{result['id_range'][1]}; {result['batches']} batches, sample batch "
+                   f"{result['sample_rows']} rows in {result['sample_seconds'] * 1000:.0f} ms, "
+                   f"about {result['estimated_seconds']:.0f}s total")
+        return
+    click.echo(f'Backfilled {run(name, batch_size, restart, echo=click.echo)} rows')
+
+
+def init_app(app):
+    app.cli.add_command(backfill_cli)
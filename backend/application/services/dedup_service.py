@@ -0,0 +1,253 @@
+import re
+import threading
+import time
+import zlib
+from collections import defaultdict
+
+import click
+import numpy as np
+from flask import current_app
+from flask.cli import AppGroup
+
+from application import db
+from application.models.job import Job
+
+jobs_cli = AppGroup('jobs', help='Maintain job postings.')
+
+# Changing any of these invalidates stored signatures; run
+# `flask jobs dedup --rehash` afterwards.
+SHINGLE_SIZE = 3  # Words per shingle
+NUM_PERM = 128
+BANDS = 32  # LSH bands of NUM_PERM // BANDS rows each
+_SEED = 20261019
+
+_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64(0xffffffff)
+_rng = np.random.RandomState(_SEED)
+_A = _rng.randint(1, 1 << 32, size=NUM_PERM).astype(np.uint64)
+_B = _rng.randint(0, 1 << 32, size=NUM_PERM).astype(np.uint64)
+
+_WORD = re.compile(r'\w+')
+
+
+def shingles(text):
+    words = _WORD.findall((text or '').lower())
+    if len(words) <= SHINGLE_SIZE:
+        return {' '.join(words)} if words else set()
+    return {' '.join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+
+def signature(title, description):
+    """MinHash signature (NUM_PERM uint32s) of a posting's text, or None if empty."""
+    hashes = np.array(
+        [zlib.crc32(shingle.encode()) for shingle in shingles(f'{title} {description}')],
+        dtype=np.uint64
+    )
+    if not len(hashes):
+        return None
+    # One universal hash per permutation, applied to every shingle at once
+    permuted = ((np.outer(hashes, _A) + _B) % _PRIME) & _MAX_HASH
+    return permuted.min(axis=0).astype(np.uint32)
+
+
+def similarity(a, b):
+    """Estimated Jaccard similarity of two signatures."""
+    return np.count_nonzero(a == b) / NUM_PERM
+
+
+def _load_signature(data):
+    return np.frombuffer(data, dtype=np.uint32) if data else None
+
+
+class LSHIndex:
+    """Banded MinHash index: jobs sharing any band are duplicate candidates."""
+
+    def __init__(self):
+        self.rows = NUM_PERM // BANDS
+        self._buckets = [defaultdict(set) for _ in range(BANDS)]
+        self._entries = {}  # job_id -> (employer_id, duplicate_of_id, signature)
+
+    def _keys(self, sig):
+        return [sig[i * self.rows:(i + 1) * self.rows].tobytes() for i in range(BANDS)]
+
+    def add(self, job_id, employer_id, duplicate_of_id, sig):
+        self.remove(job_id)
+        self._entries[job_id] = (employer_id, duplicate_of_id, sig)
+        for band, key in zip(self._buckets, self._keys(sig)):
+            band[key].add(job_id)
+
+    def remove(self, job_id):
+        entry = self._entries.pop(job_id, None)
+        if entry is None:
+            return
+        for band, key in zip(self._buckets, self._keys(entry[2])):
+            band[key].discard(job_id)
+            if not band[key]:
+                del band[key]
+
+    def match(self, sig, employer_id, threshold, exclude=None):
+        """The original posting ``sig`` duplicates, or None.
+
+        Only the same employer's postings count; different companies
+        legitimately share boilerplate. Prefers the most similar match,
+        then the oldest, and follows it to the posting it duplicates.
+        """
+        candidates = set()
+        for band, key in zip(self._buckets, self._keys(sig)):
+            candidates |= band.get(key, set())
+        candidates.discard(exclude)
+
+        best = None
+        for job_id in candidates:
+            owner, duplicate_of_id, other = self._entries[job_id]
+            if owner != employer_id:
+                continue
+            score = similarity(sig, other)
+            if score >= threshold and (best is None or (score, -job_id) > best[:2]):
+                best = (score, -job_id, duplicate_of_id or job_id)
+        return best[2] if best else None
+
+    def __len__(self):
+        return len(self._entries)
+
+
+_index = None
+_synced_through = None
+_checked_at = 0.0
+_lock = threading.Lock()
+
+
+def _index_rows(index, rows):
+    for row in rows:
+        sig = _load_signature(row.minhash)
+        if row.is_active and sig is not None:
+            index.add(row.id, row.employer_id, row.duplicate_of_id, sig)
+        else:
+            index.remove(row.id)
+
+
+def _get_index():
+    """The process-wide index, built on first use and topped up from
+    recently updated rows (other workers' writes) every few seconds."""
+    global _index, _synced_through, _checked_at
+    refresh = current_app.config.get('DUPLICATE_INDEX_REFRESH_SECONDS', 5)
+    with _lock:
+        if _index is not None and time.monotonic() - _checked_at < refresh:
+            return _index
+
+        query = db.session.query(
+            Job.id, Job.employer_id, Job.duplicate_of_id, Job.minhash, Job.is_active, Job.updated_at
+        )
+        if _index is None:
+            index = LSHIndex()
+            query = query.filter(Job.is_active == True, Job.minhash.isnot(None))
+        else:
+            index = _index
+            if _synced_through is not None:
+                query = query.filter(Job.updated_at >= _synced_through)
+        rows = query.all()
+        _index_rows(index, rows)
+
+        latest = max((row.updated_at for row in rows if row.updated_at), default=None)
+        if latest and (_synced_through is None or latest > _synced_through):
+            _synced_through = latest
+        _index = index
+        _checked_at = time.monotonic()
+        return _index
+
+
+def apply_signature(job):
+    sig = signature(job.title, job.description)
+    job.minhash = sig.tobytes() if sig is not None else None
+    return sig
+
+
+def check(job):
+    """Sign ``job`` and find the posting it near-duplicates, if any.
+
+    Unless the policy rejects duplicates, the match is recorded on
+    ``job.duplicate_of_id`` (and cleared when an edit makes it unique).
+    """
+    sig = apply_signature(job)
+    policy = current_app.config.get('DUPLICATE_JOB_POLICY', 'flag')
+    if policy == 'off' or sig is None:
+        return None
+
+    duplicate_of_id = _get_index().match(
+        sig, job.employer_id, current_app.config['DUPLICATE_JOB_THRESHOLD'], exclude=job.id
+    )
+    if policy != 'reject':
+        job.duplicate_of_id = duplicate_of_id
+    return duplicate_of_id
+
+
+def index_job(job):
+    """Reflect a committed create/update/deactivate in this process's index."""
+    if _index is None:
+        return
+    with _lock:
+        _index_rows(_index, [job])
+
+
+def exclude_collapsed(query):
+    """Hide flagged duplicates from a job query when the policy collapses them."""
+    if current_app.config.get('DUPLICATE_JOB_POLICY') == 'collapse':
+        query = query.filter(Job.duplicate_of_id.is_(None))
+    return query
+
+
+def dedup_all(rehash=False, dry_run=False, batch_size=500):
+    """Sign and dedup every active posting, oldest first.
+
+    Each job is only compared against older ones, so the earliest posting
+    of a group stays the original. Returns (jobs checked, duplicates found).
+    """
+    global _index
+    threshold = current_app.config['DUPLICATE_JOB_THRESHOLD']
+    index = LSHIndex()
+    checked = duplicates = 0
+    last_id = 0
+    while True:
+        jobs = (Job.query
+                .filter(Job.id > last_id, Job.is_active == True)
+                .order_by(Job.id)
+                .limit(batch_size)
+                .all())
+        if not jobs:
+            break
+        for job in jobs:
+            sig = _load_signature(job.minhash)
+            if sig is None or rehash:
+                sig = apply_signature(job)
+            if sig is None:
+                continue
+            duplicate_of_id = index.match(sig, job.employer_id, threshold)
+            if duplicate_of_id:
+                duplicates += 1
+            job.duplicate_of_id = duplicate_of_id
+            index.add(job.id, job.employer_id, duplicate_of_id, sig)
+            checked += 1
+        last_id = jobs[-1].id
+        if dry_run:
+            db.session.rollback()
+        else:
+            db.session.commit()
+
+    if not dry_run:
+        with _lock:
+            _index = None  # Rebuild from the new signatures on next use
+    return checked, duplicates
+
+
+@jobs_cli.command('dedup')
+@click.option('--rehash', is_flag=True, help='Recompute every signature, not just missing ones.')
+@click.option('--dry-run', is_flag=True, help='Report duplicates without saving anything.')
+def dedup_command(rehash, dry_run):
+    """Detect near-duplicate postings across the existing corpus."""
+    checked, duplicates = dedup_all(rehash=rehash, dry_run=dry_run)
+    click.echo(f'Checked {checked} jobs, found {duplicates} near-duplicates'
+               + (' (dry run, nothing saved)' if dry_run else ''))
+
+
+def init_app(app):
+    app.cli.add_command(jobs_cli)
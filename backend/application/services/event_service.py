@@ -0,0 +1,156 @@
+from datetime import datetime, timedelta
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+
+from application import db
+from application.models.event import ConsumerOffset, Event
+from application.utils.background import register_periodic
+
+events_cli = AppGroup('events', help='Maintain the event outbox.')
+
+
+def record_events(topic, event_type, items):
+    """Append events for ``(key, payload)`` pairs in the caller's transaction.
+
+    Nothing is committed here: the events become visible exactly when the
+    change they describe does, and vanish with it on rollback.
+    """
+    if not items:
+        return
+    now = datetime.utcnow()
+    db.session.execute(db.insert(Event), [
+        {'topic': topic, 'key': str(key), 'type': event_type, 'payload': payload, 'created_at': now}
+        for key, payload in items
+    ])
+
+
+def record_event(topic, key, event_type, payload):
+    record_events(topic, event_type, [(key, payload)])
+
+
+def committed_offset(consumer):
+    row = db.session.get(ConsumerOffset, consumer)
+    return row.offset if row else 0
+
+
+def read_batch(consumer, limit=None, topics=None):
+    """Events after the consumer's committed offset, oldest first.
+
+    Offsets are allocated before commit, so a slow transaction can commit
+    a lower offset after a higher one is visible. Reads stop at the first
+    event younger than EVENT_SETTLE_SECONDS so it can't be skipped.
+    Returns (events, offset to commit once they're processed).
+    """
+    limit = limit or current_app.config['EVENT_BATCH_SIZE']
+    offset = committed_offset(consumer)
+    query = Event.query.filter(Event.id > offset)
+    if topics:
+        query = query.filter(Event.topic.in_(topics))
+    rows = query.order_by(Event.id).limit(limit).all()
+
+    settled_before = datetime.utcnow() - timedelta(seconds=current_app.config['EVENT_SETTLE_SECONDS'])
+    events = []
+    for event in rows:
+        if event.created_at >= settled_before:
+            break
+        events.append(event)
+    return events, (events[-1].id if events else offset)
+
+
+def commit(consumer, offset):
+    """Record ``offset`` as processed. Offsets never move backwards."""
+    row = db.session.get(ConsumerOffset, consumer)
+    if row is None:
+        row = ConsumerOffset(consumer=consumer, offset=0)
+        db.session.add(row)
+    row.offset = max(row.offset, offset)
+    db.session.commit()
+    return row.offset
+
+
+def consume(consumer, handler, limit=None, topics=None):
+    """Pass one batch to ``handler`` and commit it if the handler succeeds.
+
+    Delivery is at-least-once: a crash between handler and commit replays
+    the batch, so handlers should be idempotent.
+    """
+    events, offset = read_batch(consumer, limit, topics)
+    if events:
+        handler(events)
+        commit(consumer, offset)
+    return len(events)
+
+
+def consumer_lag():
+    latest = db.session.query(db.func.max(Event.id)).scalar() or 0
+    return [dict(row.to_dict(), lag=latest - row.offset)
+            for row in ConsumerOffset.query.order_by(ConsumerOffset.consumer)]
+
+
+def prune():
+    """Delete events past EVENT_RETENTION_DAYS that every consumer has committed.
+
+    A registered consumer that stops committing holds events back until
+    it is removed, rather than silently missing them.
+    """
+    cutoff = datetime.utcnow() - timedelta(days=current_app.config['EVENT_RETENTION_DAYS'])
+    query = Event.query.filter(Event.created_at < cutoff)
+    slowest = db.session.query(db.func.min(ConsumerOffset.offset)).scalar()
+    if slowest is not None:
+        query = query.filter(Event.id <= slowest)
+    deleted = query.delete(synchronize_session=False)
+    db.session.commit()
+    return deleted
+
+
+def compact():
+    """Keep only the newest event per key on EVENT_COMPACTED_TOPICS.
+
+    Only events older than EVENT_COMPACT_AFTER_HOURS are dropped, so live
+    consumers still see every change; one that falls further behind than
+    that skips straight to the latest snapshot of each key.
+    """
+    cutoff = datetime.utcnow() - timedelta(hours=current_app.config['EVENT_COMPACT_AFTER_HOURS'])
+    newer = db.aliased(Event)
+    superseded = db.exists().where(
+        newer.topic == Event.topic,
+        newer.key == Event.key,
+        newer.id > Event.id
+    )
+    deleted = Event.query.filter(
+        Event.topic.in_(current_app.config['EVENT_COMPACTED_TOPICS']),
+        Event.created_at < cutoff,
+        superseded
+    ).delete(synchronize_session=False)
+    db.session.commit()
+    return deleted
+
+
+def maintain():
+    return compact(), prune()
+
+
+@events_cli.command('compact')
+def compact_command():
+    """Drop superseded events on compacted topics."""
+    click.echo(f'Compacted {compact()} events')
+
+
+@events_cli.command('prune')
+def prune_command():
+    """Delete events past retention that all consumers have read."""
+    click.echo(f'Pruned {prune()} events')
+
+
+@events_cli.command('lag')
+def lag_command():
+    """Show each consumer's committed offset and lag."""
+    for row in consumer_lag():
+        click.echo(f"{row['consumer']}: offset {row['offset']}, lag {row['lag']}")
+
+
+def init_app(app):
+    app.cli.add_command(events_cli)
+    register_periodic(app, 'events-maintain', app.config['EVENT_MAINTENANCE_INTERVAL'], maintain)
@@ -0,0 +1,98 @@
+from collections import defaultdict
+
+from flask import current_app
+
+from application import db
+from application.models.job import Job
+from application.utils.cache import MISSING, TTLCache
+
+# Upper bounds (inclusive) of each salary bucket; anything above the last
+# edge falls into a final open-ended bucket.
+SALARY_BUCKET_EDGES = [50000, 75000, 100000, 125000, 150000, 200000]
+
+FACET_COLUMNS = {
+    'role_type': Job.role_type,
+    'remote_type': Job.remote_type,
+    'experience_level': Job.experience_level,
+    'company_size': Job.company_size,
+    'salary': Job.salary_bucket,
+}
+
+_cache = None
+
+
+def _get_cache():
+    global _cache
+    if _cache is None:
+        _cache = TTLCache(
+            ttl=current_app.config.get('FACET_CACHE_TTL', 60),
+            max_size=current_app.config.get('FACET_CACHE_SIZE', 512)
+        )
+    return _cache
+
+
+def salary_bucket(salary_max):
+    """Index of the histogram bucket a posting's top salary falls in."""
+    if salary_max is None:
+        return None
+    for i, edge in enumerate(SALARY_BUCKET_EDGES):
+        if salary_max <= edge:
+            return i
+    return len(SALARY_BUCKET_EDGES)
+
+
+def salary_bucket_label(bucket):
+    if bucket == 0:
+        return f'<={SALARY_BUCKET_EDGES[0] // 1000}k'
+    if bucket == len(SALARY_BUCKET_EDGES):
+        return f'>{SALARY_BUCKET_EDGES[-1] // 1000}k'
+    low = SALARY_BUCKET_EDGES[bucket - 1] // 1000
+    high = SALARY_BUCKET_EDGES[bucket] // 1000
+    return f'{low}k-{high}k'
+
+
+def parse_facets(value):
+    """Split ?facets=a,b into known facet names, or None if any are unknown."""
+    names = [name.strip() for name in value.split(',') if name.strip()]
+    if not names or any(name not in FACET_COLUMNS for name in names):
+        return None
+    return names
+
+
+def facet_counts(query, names, cache_key):
+    """Counts per value for each requested facet over the filtered query.
+
+    Runs a single GROUP BY over all requested facet columns and folds the
+    combined groups into per-facet counts, instead of one query per facet.
+    """
+    cache = _get_cache()
+    key = (cache_key, tuple(sorted(names)))
+    cached = cache.get(key)
+    if cached is not MISSING:
+        return cached
+
+    columns = [FACET_COLUMNS[name] for name in names]
+    rows = (query.order_by(None)
+            .with_entities(*columns, db.func.count(Job.id))
+            .group_by(*columns)
+            .all())
+
+    counts = {name: defaultdict(int) for name in names}
+    for row in rows:
+        count = row[-1]
+        for name, value in zip(names, row[:-1]):
+            if value is None:
+                continue
+            if name == 'salary':
+                value = salary_bucket_label(value)
+            counts[name][value] += count
+
+    result = {name: dict(values) for name, values in counts.items()}
+    cache.set(key, result)
+    return result
+
+
+def invalidate():
+    """Drop cached counts; call after any job mutation."""
+    if _cache is not None:
+        _cache.clear()
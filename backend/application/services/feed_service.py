@@ -0,0 +1,312 @@
+from array import array
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import click
+import numpy as np
+from flask import current_app
+from flask.cli import AppGroup
+from sqlalchemy.exc import IntegrityError
+
+from application import db
+from application.models.feed_queue import FeedQueue
+from application.models.job import Job
+from application.models.profile import Profile
+from application.models.user import User
+from application.services import dedup_service, geo_service, swipe_service
+from application.utils.background import register_periodic
+from application.utils.db_routing import primary
+
+feed_cli = AppGroup('feed', help='Manage precomputed feed queues.')
+
+# Incremental inserts run off the request thread, one at a time
+_insert_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='feed-insert')
+_INSERT_BATCH_SIZE = 500
+
+_JOB_COLUMNS = (
+    Job.id, Job.created_at, Job.role_type, Job.remote_type,
+    Job.salary_max, Job.latitude, Job.longitude,
+)
+
+
+class JobArrays:
+    """Column-wise view of candidate jobs for vectorized scoring."""
+
+    def __init__(self, rows):
+        self.ids = np.array([r.id for r in rows], dtype=np.int32)
+        self.created = np.array(
+            [r.created_at.timestamp() if r.created_at else 0.0 for r in rows], dtype=np.float64
+        )
+        self.role_types = np.array([r.role_type or '' for r in rows], dtype=object)
+        self.remote_types = np.array([r.remote_type or '' for r in rows], dtype=object)
+        self.salary_max = np.array(
+            [r.salary_max if r.salary_max is not None else -1 for r in rows], dtype=np.float64
+        )
+        self.lats = np.array([r.latitude if r.latitude is not None else np.nan for r in rows])
+        self.lons = np.array([r.longitude if r.longitude is not None else np.nan for r in rows])
+
+
+def _candidate_jobs(now):
+    query = db.session.query(*_JOB_COLUMNS).filter(
+        Job.is_active == True,
+        Job.expires_at > now
+    )
+    return JobArrays(dedup_service.exclude_collapsed(query).all())
+
+
+def score_jobs(jobs, profile, now):
+    """Rank score per job: recency plus how well it matches the profile."""
+    half_life = current_app.config['FEED_RECENCY_HALF_LIFE_DAYS'] * 86400
+    age = np.maximum(now.timestamp() - jobs.created, 0)
+    scores = np.power(0.5, age / half_life)
+
+    if profile is None:
+        return scores
+
+    if profile.preferred_role_types:
+        scores += np.isin(jobs.role_types, profile.preferred_role_types) * 1.0
+    if profile.remote_preference:
+        scores += (jobs.remote_types == profile.remote_preference) * 0.5
+    if profile.salary_expectation_min:
+        known = jobs.salary_max >= 0
+        meets = jobs.salary_max >= profile.salary_expectation_min
+        scores += np.where(known & meets, 0.5, 0.0) - np.where(known & ~meets, 1.0, 0.0)
+    if profile.latitude is not None:
+        with np.errstate(invalid='ignore'):
+            distances = geo_service.haversine_km(
+                profile.latitude, profile.longitude, jobs.lats, jobs.lons
+            )
+            scores += (distances <= current_app.config['FEED_NEARBY_KM']) * 0.5
+    return scores
+
+
+def _pack(ids, scores):
+    return array('i', ids).tobytes(), array('f', scores).tobytes()
+
+
+def _unpack_ids(queue):
+    ids = array('i')
+    ids.frombytes(queue.job_ids)
+    return ids
+
+
+def _unpack_scores(queue):
+    scores = array('f')
+    scores.frombytes(queue.scores)
+    return scores
+
+
+def build_queue(user_id, jobs=None, now=None, queue=None):
+    """Rank every eligible job for one candidate and store the top of the list."""
+    now = now or datetime.utcnow()
+    if jobs is None:
+        jobs = _candidate_jobs(now)
+
+    profile = Profile.query.filter_by(user_id=user_id).first()
+    scores = score_jobs(jobs, profile, now)
+
+    eligible = ~np.isin(jobs.ids, swipe_service.swiped_job_ids(user_id))
+    ids, scores = jobs.ids[eligible], scores[eligible]
+
+    # Highest score first, newest job breaking ties
+    order = np.lexsort((-ids, -scores))[:current_app.config['FEED_QUEUE_SIZE']]
+    job_ids, job_scores = _pack(ids[order].tolist(), scores[order].tolist())
+
+    if queue is None:
+        queue = db.session.get(FeedQueue, user_id) or FeedQueue(user_id=user_id, generation=0)
+    queue.job_ids = job_ids
+    queue.scores = job_scores
+    queue.generation = (queue.generation or 0) + 1
+    queue.built_at = now
+    db.session.add(queue)
+    db.session.commit()
+    return queue
+
+
+def rebuild_all():
+    """Rebuild queues for every recently active candidate."""
+    now = datetime.utcnow()
+    active_since = now - timedelta(days=current_app.config['FEED_ACTIVE_DAYS'])
+    user_ids = [row[0] for row in db.session.query(User.id).filter(
+        User.user_type == 'candidate',
+        User.last_login >= active_since
+    )]
+    jobs = _candidate_jobs(now)
+    for user_id in user_ids:
+        build_queue(user_id, jobs=jobs, now=now)
+    return len(user_ids)
+
+
+def insert_job(job_id):
+    """Queue a new job for insertion into existing feed queues."""
+    app = current_app._get_current_object()
+
+    def run():
+        with app.app_context():
+            try:
+                _insert_job(job_id)
+            except Exception:
+                db.session.rollback()
+                app.logger.exception(f"Failed to insert job {job_id} into feed queues")
+
+    return _insert_executor.submit(run)
+
+
+def _insert_job(job_id):
+    """Add a new job to the candidate queues it ranks into.
+
+    Queues older than FEED_QUEUE_MAX_AGE are skipped, since their next
+    read rebuilds them anyway. Only queues the job actually enters are
+    rewritten (and get a new generation), one batch per transaction.
+    """
+    now = datetime.utcnow()
+    rows = dedup_service.exclude_collapsed(
+        db.session.query(*_JOB_COLUMNS).filter(Job.id == job_id)
+    ).all()
+    if not rows:
+        return
+    jobs = JobArrays(rows)
+    max_size = current_app.config['FEED_QUEUE_SIZE']
+    fresh_since = now - timedelta(seconds=current_app.config['FEED_QUEUE_MAX_AGE'])
+    queues_query = FeedQueue.query.join(User, User.id == FeedQueue.user_id).filter(
+        User.user_type == 'candidate',
+        FeedQueue.built_at >= fresh_since
+    )
+
+    last_user_id = 0
+    while True:
+        queues = (queues_query
+                  .filter(FeedQueue.user_id > last_user_id)
+                  .order_by(FeedQueue.user_id)
+                  .limit(_INSERT_BATCH_SIZE)
+                  .all())
+        if not queues:
+            return
+        last_user_id = queues[-1].user_id
+        profiles = {p.user_id: p for p in Profile.query.filter(
+            Profile.user_id.in_([queue.user_id for queue in queues])
+        )}
+        for queue in queues:
+            score = float(score_jobs(jobs, profiles.get(queue.user_id), now)[0])
+            scores = _unpack_scores(queue)
+            if len(scores) >= max_size and score <= scores[-1]:
+                continue
+            ids = _unpack_ids(queue)
+            if job_id in ids:
+                continue
+
+            # Scores are stored descending; bisect on the negated list
+            position = bisect_left([-s for s in scores], -score)
+            ids.insert(position, job_id)
+            scores.insert(position, score)
+            del ids[max_size:]
+            del scores[max_size:]
+
+            queue.job_ids = ids.tobytes()
+            queue.scores = scores.tobytes()
+            queue.generation += 1
+        db.session.commit()
+
+
+def encode_cursor(offset, last_id):
+    return f'{offset}.{last_id}'
+
+
+def _resume_position(ids, cursor):
+    """Where to continue in ``ids`` given a cursor from a previous page.
+
+    The cursor carries both the offset and the last job served. The offset
+    is trusted when it still points just past that job (the common case);
+    otherwise inserts or a rebuild moved things and we look the job up.
+    """
+    if not cursor:
+        return 0
+    try:
+        offset, last_id = (int(part) for part in cursor.split('.'))
+    except ValueError:
+        return 0
+    if 0 < offset <= len(ids) and ids[offset - 1] == last_id:
+        return offset
+    try:
+        return ids.index(last_id) + 1
+    except ValueError:
+        return 0
+
+
+def get_queue(user_id):
+    """Current queue for a user, rebuilding it if missing or too old.
+
+    Always reads and builds on the primary, even from a ``@read_only``
+    route: a lagging replica would report a missing or stale queue that
+    the primary already rebuilt.
+    """
+    with primary():
+        queue = db.session.get(FeedQueue, user_id)
+        max_age = timedelta(seconds=current_app.config['FEED_QUEUE_MAX_AGE'])
+        if queue is None:
+            try:
+                queue = build_queue(user_id, queue=FeedQueue(user_id=user_id, generation=0))
+            except IntegrityError:
+                # A concurrent first request built it
+                db.session.rollback()
+                queue = db.session.get(FeedQueue, user_id)
+        elif queue.built_at < datetime.utcnow() - max_age:
+            queue = build_queue(user_id, queue=queue)
+    return queue
+
+
+def next_page(user_id, cursor=None, limit=20, queue=None):
+    """(id, version, updated_at) rows for the next ``limit`` cards, and the cursor.
+
+    Jobs deactivated, expired or swiped since the queue was built are
+    skipped, reading further down the queue to fill the page.
+    """
+    queue = queue or get_queue(user_id)
+    ids = _unpack_ids(queue)
+    position = start = _resume_position(ids, cursor)
+    rows = []
+    while len(rows) < limit and position < len(ids):
+        chunk = ids[position:position + limit - len(rows)].tolist()
+        position += len(chunk)
+        live = {row.id: row for row in db.session.query(Job.id, Job.version, Job.updated_at).filter(
+            Job.id.in_(chunk),
+            Job.is_active == True,
+            Job.expires_at > datetime.utcnow()
+        )}
+        swiped = swipe_service.already_swiped(user_id, list(live))
+        rows.extend(live[job_id] for job_id in chunk if job_id in live and job_id not in swiped)
+    if position == start:
+        return [], cursor
+    return rows, encode_cursor(position, ids[position - 1])
+
+
+def load_jobs(rows):
+    """Full Job objects for ``next_page`` rows, in page order."""
+    if not rows:
+        return []
+    jobs_by_id = {job.id: job for job in Job.query.filter(Job.id.in_([row.id for row in rows]))}
+    return [jobs_by_id[row.id] for row in rows if row.id in jobs_by_id]
+
+
+def next_cards(user_id, cursor=None, limit=20, queue=None):
+    """The next ``limit`` jobs from a user's queue and the cursor after them."""
+    rows, next_cursor = next_page(user_id, cursor, limit, queue)
+    return load_jobs(rows), next_cursor
+
+
+@feed_cli.command('rebuild')
+@click.option('--user-id', type=int, help='Only rebuild this user\'s queue.')
+def rebuild_command(user_id):
+    """Rebuild feed queues."""
+    if user_id:
+        build_queue(user_id)
+        click.echo(f'Rebuilt feed queue for user {user_id}')
+    else:
+        count = rebuild_all()
+        click.echo(f'Rebuilt {count} feed queues')
+
+
+def init_app(app):
+    app.cli.add_command(feed_cli)
+    register_periodic(app, 'feed-materializer', app.config['FEED_REBUILD_INTERVAL'], rebuild_all)
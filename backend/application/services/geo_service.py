@@ -0,0 +1,164 @@
+import csv
+import math
+import os
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0088
+GEOHASH_PRECISION = 7
+_BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+GAZETTEER_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'gazetteer.csv')
+
+# Common shorthand that isn't worth a gazetteer row of its own
+ALIASES = {
+    'nyc': 'new york',
+    'new york city': 'new york',
+    'manhattan': 'new york',
+    'sf': 'san francisco',
+    'bay area': 'san francisco',
+    'sf bay area': 'san francisco',
+    'silicon valley': 'palo alto',
+    'la': 'los angeles',
+    'dc': 'washington',
+    'washington dc': 'washington',
+    'bengaluru': 'bangalore',
+}
+
+_gazetteer = None
+
+
+def _load_gazetteer():
+    global _gazetteer
+    if _gazetteer is None:
+        index = {}
+        with open(GAZETTEER_PATH, newline='') as f:
+            for row in csv.DictReader(f):
+                coords = (float(row['latitude']), float(row['longitude']))
+                name = row['name'].lower()
+                # First row wins for bare city names, so list the bigger city first
+                index.setdefault(name, coords)
+                for qualifier in (row['region'], row['country']):
+                    if qualifier:
+                        index[f"{name}, {qualifier.lower()}"] = coords
+        _gazetteer = index
+    return _gazetteer
+
+
+def geocode(location):
+    """Resolve a free-text location to (lat, lon) using the bundled gazetteer.
+
+    Returns None for unknown places and for values like 'Remote'.
+    """
+    if not location:
+        return None
+
+    index = _load_gazetteer()
+    key = ' '.join(location.lower().replace('.', '').split())
+    key = ALIASES.get(key, key)
+    if key in index:
+        return index[key]
+
+    # "Austin, TX, USA" -> "austin, tx" -> "austin"
+    parts = [p.strip() for p in key.split(',') if p.strip()]
+    while parts:
+        candidate = ', '.join(parts)
+        candidate = ALIASES.get(candidate, candidate)
+        if candidate in index:
+            return index[candidate]
+        parts.pop()
+    return None
+
+
+def encode_geohash(lat, lon, precision=GEOHASH_PRECISION):
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True
+    while len(chars) < precision:
+        rng, value = (lon_range, lon) if even else (lat_range, lat)
+        mid = (rng[0] + rng[1]) / 2
+        if value >= mid:
+            bits = (bits << 1) | 1
+            rng[0] = mid
+        else:
+            bits <<= 1
+            rng[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(_BASE32[bits])
+            bits = 0
+            bit_count = 0
+    return ''.join(chars)
+
+
+def _cell_size(precision):
+    """Height and width of a geohash cell in degrees."""
+    lon_bits = math.ceil(precision * 5 / 2)
+    lat_bits = math.floor(precision * 5 / 2)
+    return 180.0 / (2 ** lat_bits), 360.0 / (2 ** lon_bits)
+
+
+def covering_cells(lat, lon, radius_km):
+    """Geohash prefixes whose union contains the circle around (lat, lon).
+
+    Picks the finest precision whose cells are at least as large as the
+    radius, then returns the center cell plus its eight neighbours. An
+    empty list means the circle is too large to prefilter usefully.
+    """
+    lat_radius = math.degrees(radius_km / EARTH_RADIUS_KM)
+    cos_lat = max(math.cos(math.radians(lat)), 1e-6)
+    lon_radius = lat_radius / cos_lat
+
+    precision = 0
+    for p in range(GEOHASH_PRECISION, 0, -1):
+        height, width = _cell_size(p)
+        if height >= lat_radius and width >= lon_radius:
+            precision = p
+            break
+    if precision == 0:
+        return []
+
+    height, width = _cell_size(precision)
+    cells = set()
+    for dlat in (-height, 0, height):
+        for dlon in (-width, 0, width):
+            nlat = min(max(lat + dlat, -90.0), 90.0)
+            nlon = (lon + dlon + 180.0) % 360.0 - 180.0
+            cells.add(encode_geohash(nlat, nlon, precision))
+    return sorted(cells)
+
+
+def haversine_km(lat, lon, lats, lons):
+    """Distances in km from one point to arrays of points."""
+    lat1 = math.radians(lat)
+    lon1 = math.radians(lon)
+    lat2 = np.radians(np.asarray(lats, dtype=np.float64))
+    lon2 = np.radians(np.asarray(lons, dtype=np.float64))
+    a = (np.sin((lat2 - lat1) / 2) ** 2
+         + math.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def parse_point(value):
+    """Parse 'lat,lon' into floats, or return None if malformed."""
+    try:
+        lat, lon = (float(v) for v in value.split(','))
+    except (AttributeError, ValueError):
+        return None
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        return None
+    return lat, lon
+
+
+def apply_location(obj, location):
+    """Set latitude/longitude/geohash on a Job or Profile from free text."""
+    coords = geocode(location)
+    if coords:
+        obj.latitude, obj.longitude = coords
+        obj.geohash = encode_geohash(*coords)
+    else:
+        obj.latitude = obj.longitude = obj.geohash = None
@@ -0,0 +1,83 @@
+import multiprocessing
+import os
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from flask import current_app
+
+from application.utils.images import VARIANTS, process_picture, variant_path
+
+DIGEST = re.compile(r'^[0-9a-f]{64}$')
+
+_pool = None
+_pool_lock = threading.Lock()
+_thread_pool = None
+
+
+def _gevent_patched():
+    try:
+        from gevent import monkey
+    except ImportError:
+        return False
+    return monkey.is_module_patched('threading')
+
+
+def _get_pool():
+    # Spawned rather than forked: workers may be running gevent or threads
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=current_app.config['PICTURE_WORKERS'] or None,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        return _pool
+
+
+def root():
+    return os.path.abspath(current_app.config['PICTURE_UPLOAD_PATH'])
+
+
+def _get_thread_pool():
+    # Under run.py's monkey-patched workers a blocking future.result() would
+    # stall the hub, and the process pool's management thread would itself
+    # be a greenlet. Resize in native threads instead: Pillow releases the
+    # GIL while decoding and resampling, and run.py already forks a worker
+    # per core. A dedicated pool keeps gevent's own (used for DNS) free.
+    global _thread_pool
+    from gevent.threadpool import ThreadPool
+    with _pool_lock:
+        if _thread_pool is None:
+            _thread_pool = ThreadPool(current_app.config['PICTURE_WORKERS'] or os.cpu_count())
+        return _thread_pool
+
+
+def process(data):
+    """Resize and re-encode an upload in the worker pool; returns its digest.
+
+    Raises InvalidImage for files Pillow can't read or that are too large,
+    and TimeoutError past PICTURE_PROCESS_TIMEOUT.
+    """
+    args = (data, root(), current_app.config['PICTURE_MAX_PIXELS'])
+    timeout = current_app.config['PICTURE_PROCESS_TIMEOUT']
+    if _gevent_patched():
+        from gevent import Timeout
+        result = _get_thread_pool().spawn(process_picture, *args)
+        try:
+            return result.get(timeout=timeout)
+        except Timeout:
+            raise TimeoutError('Picture processing timed out')
+    return _get_pool().submit(process_picture, *args).result(timeout=timeout)
+
+
+def path_for(digest, variant):
+    """File for a variant, or None for an unknown digest or variant name."""
+    if not DIGEST.match(digest) or variant not in VARIANTS:
+        return None
+    path = variant_path(root(), digest, variant)
+    return path if os.path.exists(path) else None
+
+
+def urls(digest):
+    return {name: f'/api/profiles/pictures/{digest}/{name}.jpg' for name in VARIANTS}
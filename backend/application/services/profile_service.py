@@ -0,0 +1,75 @@
+from flask import current_app
+
+from application import db
+from application.models.profile import Profile
+from application.utils.cache import TTLCache
+
+# Same keys, order and formatting as Profile.to_dict()
+FIELDS = (
+    'id', 'user_id', 'full_name', 'bio', 'profile_picture_path', 'title', 'years_of_experience', 'skills',
+    'preferred_role_types', 'preferred_locations', 'remote_preference',
+    'salary_expectation_min', 'salary_expectation_max', 'latitude', 'longitude',
+    'created_at', 'version', 'updated_at',
+)
+_COLUMNS = [getattr(Profile, field) for field in FIELDS]
+_DATETIME_POSITIONS = [FIELDS.index('created_at'), FIELDS.index('updated_at')]
+
+_cache = None
+
+
+def _get_cache():
+    global _cache
+    if _cache is None:
+        _cache = TTLCache(
+            ttl=current_app.config.get('PROFILE_CACHE_TTL', 60),
+            max_size=current_app.config.get('PROFILE_CACHE_SIZE', 10000)
+        )
+    return _cache
+
+
+def serialize_rows(rows):
+    """Column tuples (in FIELDS order) to profile dicts, without loading
+    ORM instances or calling to_dict() per row."""
+    result = []
+    for row in rows:
+        values = list(row)
+        for i in _DATETIME_POSITIONS:
+            if values[i] is not None:
+                values[i] = values[i].isoformat()
+        result.append(dict(zip(FIELDS, values)))
+    return result
+
+
+def _load(user_ids):
+    rows = db.session.query(*_COLUMNS).filter(Profile.user_id.in_(user_ids)).all()
+    return {profile['user_id']: profile for profile in serialize_rows(rows)}
+
+
+def get_profile(user_id):
+    """Serialized profile for one user, or None. Read-through cached."""
+    return get_profiles([user_id]).get(user_id)
+
+
+def get_profiles(user_ids):
+    """Serialized profiles keyed by user_id; users without one are left out.
+
+    Cache hits are served as-is and every miss is resolved by a single
+    IN query. Misses are cached too, so unknown IDs don't keep hitting
+    the database. Returned dicts are shared; don't mutate them.
+    """
+    cache = _get_cache()
+    found = cache.get_many(user_ids)
+    missing = [user_id for user_id in user_ids if user_id not in found]
+    if missing:
+        loaded = _load(missing)
+        for user_id in missing:
+            profile = loaded.get(user_id)
+            cache.set(user_id, profile)
+            found[user_id] = profile
+    return {user_id: profile for user_id, profile in found.items() if profile is not None}
+
+
+def invalidate(user_id):
+    # Per process only: other workers serve their copy until the TTL lapses
+    if _cache is not None:
+        _cache.delete(user_id)
@@ -0,0 +1,172 @@
+import threading
+import time
+from datetime import datetime, timedelta
+
+from flask import current_app
+
+from application import db
+from application.extensions import jwt
+from application.models.revoked_token import RevokedToken
+from application.models.user import User
+from application.utils.background import register_periodic
+from application.utils.bloom import BloomFilter
+
+
+class _State:
+    """This process's view of revocations: a Bloom filter of revoked jtis
+    plus per-user "revoked everything issued before" cutoffs."""
+
+    def __init__(self, bloom, last_id, cutoffs):
+        self.bloom = bloom
+        self.last_id = last_id
+        self.cutoffs = cutoffs  # user_id -> unix time
+        self.synced_at = time.monotonic()
+        self.built_at = self.synced_at
+
+
+_state = None
+_lock = threading.Lock()
+
+
+def _load_cutoffs():
+    since = datetime.utcnow() - current_app.config['JWT_REFRESH_TOKEN_EXPIRES']
+    rows = db.session.query(User.id, User.tokens_revoked_before).filter(
+        User.tokens_revoked_before > since
+    )
+    # Whole seconds, like iat: a token issued in the same second just after
+    # a logout-all must stay valid (one issued just before it does too)
+    return {user_id: int(_timestamp(cutoff)) for user_id, cutoff in rows}
+
+
+def _timestamp(naive_utc):
+    return (naive_utc - datetime(1970, 1, 1)).total_seconds()
+
+
+def _settled_before():
+    return datetime.utcnow() - timedelta(seconds=current_app.config['REVOCATION_SETTLE_SECONDS'])
+
+
+def _rebuild():
+    """Fresh filter from unexpired revocations; drops pruned entries."""
+    settled_before = _settled_before()
+    rows = db.session.query(RevokedToken.id, RevokedToken.jti).filter(
+        RevokedToken.expires_at > datetime.utcnow()
+    ).all()
+    bloom = BloomFilter(
+        max(current_app.config['REVOCATION_BLOOM_CAPACITY'], 2 * len(rows)),
+        current_app.config['REVOCATION_BLOOM_ERROR_RATE']
+    )
+    for _, jti in rows:
+        bloom.add(jti)
+    # Recent rows are re-read by the next sync (see there)
+    last_id = db.session.query(db.func.max(RevokedToken.id)).filter(
+        RevokedToken.revoked_at < settled_before
+    ).scalar() or 0
+    return _State(bloom, last_id, _load_cutoffs())
+
+
+def sync(force_rebuild=False):
+    """Pick up revocations made by any worker since the last sync.
+
+    Callers that just committed a revocation sync right away so it takes
+    effect in this process immediately; other workers see it within
+    REVOCATION_SYNC_INTERVAL.
+    """
+    global _state
+    with _lock:
+        state = _state
+        rebuild_after = current_app.config['REVOCATION_REBUILD_INTERVAL']
+        if (force_rebuild or state is None
+                or time.monotonic() - state.built_at > rebuild_after
+                or state.bloom.count > state.bloom.capacity):
+            _state = _rebuild()
+            return
+
+        # IDs are allocated before commit, so a lower id can become visible
+        # after a higher one was read. The watermark stops at the first row
+        # younger than REVOCATION_SETTLE_SECONDS and everything from there
+        # is read again next time, as the analytics aggregator does.
+        settled_before = _settled_before()
+        settled = True
+        rows = db.session.query(RevokedToken.id, RevokedToken.jti, RevokedToken.revoked_at).filter(
+            RevokedToken.id > state.last_id
+        ).order_by(RevokedToken.id).all()
+        for row_id, jti, revoked_at in rows:
+            if jti not in state.bloom:
+                state.bloom.add(jti)
+            if revoked_at is not None and revoked_at >= settled_before:
+                settled = False
+            if settled:
+                state.last_id = row_id
+        state.cutoffs = _load_cutoffs()
+        state.synced_at = time.monotonic()
+
+
+def _current_state():
+    # With background jobs running this is always fresh; without them
+    # (development), requests sync lazily at the same interval
+    state = _state
+    if state is None or time.monotonic() - state.synced_at > current_app.config['REVOCATION_SYNC_INTERVAL']:
+        sync()
+        state = _state
+    return state
+
+
+def is_revoked(jwt_header, jwt_payload):
+    """Per-request blocklist check. Only Bloom filter hits touch the database."""
+    state = _current_state()
+    cutoff = state.cutoffs.get(jwt_payload['sub'])
+    if cutoff is not None and jwt_payload['iat'] < cutoff:
+        return True
+    jti = jwt_payload['jti']
+    if jti not in state.bloom:
+        return False
+    return db.session.query(RevokedToken.id).filter_by(jti=jti).first() is not None
+
+
+def revoke(jwt_payload):
+    """Revoke one token. Adds to the session; the caller commits.
+
+    A second revoke of the same jti fails the commit on the unique index,
+    which is what makes refresh-token rotation single-use under races.
+    """
+    db.session.add(RevokedToken(
+        jti=jwt_payload['jti'],
+        user_id=jwt_payload['sub'],
+        token_type=jwt_payload['type'],
+        expires_at=datetime.utcfromtimestamp(jwt_payload['exp'])
+    ))
+
+
+def revoke_unrevoked(jwt_payloads):
+    """Revoke each token that isn't revoked yet. The caller commits.
+
+    Unlike revoke(), a token that was already revoked (a refresh token
+    rotated by /refresh, say) is skipped instead of failing the others.
+    """
+    jtis = [payload['jti'] for payload in jwt_payloads]
+    revoked = {row[0] for row in db.session.query(RevokedToken.jti).filter(RevokedToken.jti.in_(jtis))}
+    for payload in jwt_payloads:
+        if payload['jti'] not in revoked:
+            revoke(payload)
+
+
+def revoke_all(user):
+    """Revoke every token issued to ``user`` so far. The caller commits."""
+    user.tokens_revoked_before = datetime.utcnow()
+
+
+def prune():
+    """Delete revocations for tokens that have expired anyway."""
+    deleted = RevokedToken.query.filter(
+        RevokedToken.expires_at <= datetime.utcnow()
+    ).delete(synchronize_session=False)
+    db.session.commit()
+    return deleted
+
+
+def init_app(app):
+    jwt.token_in_blocklist_loader(is_revoked)
+    register_periodic(app, 'revocation-sync', app.config['REVOCATION_SYNC_INTERVAL'], sync,
+                      per_process=True)
+    register_periodic(app, 'revocation-prune', app.config['REVOCATION_PRUNE_INTERVAL'], prune)
@@ -0,0 +1,216 @@
+import os
+from collections import defaultdict
+from datetime import datetime
+
+import click
+import numpy as np
+from flask import current_app
+from flask.cli import AppGroup
+
+from application import db
+from application.models.job_stats import AggregatorWatermark
+from application.models.swipe import Swipe
+from application.models.swipe_archive import SwipeArchive, SwipeSummary
+from application.services import analytics_service
+from application.utils.background import register_periodic
+
+swipes_cli = AppGroup('swipes', help='Manage swipe storage.')
+
+_ARCHIVE_COLUMNS = ('id', 'user_id', 'job_id', 'liked', 'created_at')
+
+
+def _unpack(data):
+    return np.frombuffer(data, dtype=np.int32) if data else np.empty(0, dtype=np.int32)
+
+
+def has_swiped(user_id, job_id):
+    """Whether the user swiped on the job, in the hot table or the archive."""
+    if db.session.query(Swipe.id).filter_by(user_id=user_id, job_id=job_id).first():
+        return True
+    summary = db.session.get(SwipeSummary, user_id)
+    if summary is None:
+        return False
+    ids = _unpack(summary.job_ids)
+    i = np.searchsorted(ids, job_id)
+    return bool(i < len(ids) and ids[i] == job_id)
+
+
+def already_swiped(user_id, job_ids):
+    """The subset of ``job_ids`` the user has swiped on, hot or archived."""
+    if not job_ids:
+        return set()
+    swiped = {row[0] for row in db.session.query(Swipe.job_id).filter(
+        Swipe.user_id == user_id,
+        Swipe.job_id.in_(job_ids)
+    )}
+    summary = db.session.get(SwipeSummary, user_id)
+    if summary is not None:
+        archived = np.intersect1d(_unpack(summary.job_ids), np.array(job_ids, dtype=np.int32))
+        swiped.update(int(job_id) for job_id in archived)
+    return swiped
+
+
+def swiped_job_ids(user_id):
+    """Every job the user has swiped on, as an int32 array."""
+    hot = [row[0] for row in db.session.query(Swipe.job_id).filter_by(user_id=user_id)]
+    summary = db.session.get(SwipeSummary, user_id)
+    archived = _unpack(summary.job_ids) if summary else _unpack(None)
+    return np.union1d(archived, np.array(hot, dtype=np.int32))
+
+
+def swipe_counts(user_id):
+    """(total swipes, liked swipes) across hot and archived storage."""
+    total, liked = db.session.query(
+        db.func.count(Swipe.id),
+        db.func.coalesce(db.func.sum(db.case((Swipe.liked == True, 1), else_=0)), 0)
+    ).filter(Swipe.user_id == user_id).one()
+    summary = db.session.get(SwipeSummary, user_id)
+    if summary:
+        total += summary.total
+        liked += summary.liked
+    return total, liked
+
+
+def _archive_cutoff(now=None):
+    """Start of the oldest month that stays in the hot table."""
+    now = now or datetime.utcnow()
+    months = now.year * 12 + now.month - 1 - current_app.config['SWIPE_HOT_MONTHS']
+    return datetime(months // 12, months % 12 + 1, 1)
+
+
+def _archivable(cutoff):
+    # Never archive swipes the analytics aggregator hasn't counted yet
+    watermark = db.session.get(AggregatorWatermark, analytics_service.WATERMARK)
+    return db.and_(Swipe.created_at < cutoff, Swipe.id <= (watermark.last_id if watermark else 0))
+
+
+def _write_file(month, rows):
+    root = current_app.config['SWIPE_ARCHIVE_PATH']
+    relative = os.path.join(month, f'swipes-{rows[0].id}-{rows[-1].id}.npz')
+    path = os.path.join(root, relative)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    columns = {
+        'id': np.array([row.id for row in rows], dtype=np.int32),
+        'user_id': np.array([row.user_id for row in rows], dtype=np.int32),
+        'job_id': np.array([row.job_id for row in rows], dtype=np.int32),
+        'liked': np.array([row.liked for row in rows], dtype=np.bool_),
+        'created_at': np.array(
+            [row.created_at for row in rows], dtype='datetime64[s]'
+        ).astype(np.int64),
+    }
+    with open(path + '.tmp', 'wb') as f:
+        np.savez_compressed(f, **columns)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(path + '.tmp', path)
+    return relative
+
+
+def _archive_batch(rows, archivable):
+    by_month = defaultdict(list)
+    by_user = defaultdict(list)
+    for row in rows:
+        by_month[row.created_at.strftime('%Y-%m')].append(row)
+        by_user[row.user_id].append(row)
+
+    # Files first; they only count once their manifest row commits below
+    for month, month_rows in by_month.items():
+        db.session.add(SwipeArchive(
+            month=month,
+            path=_write_file(month, month_rows),
+            min_swipe_id=month_rows[0].id,
+            max_swipe_id=month_rows[-1].id,
+            row_count=len(month_rows)
+        ))
+
+    summaries = {summary.user_id: summary for summary in
+                 SwipeSummary.query.filter(SwipeSummary.user_id.in_(list(by_user)))}
+    for user_id, user_rows in by_user.items():
+        summary = summaries.get(user_id) or SwipeSummary(user_id=user_id, total=0, liked=0)
+        job_ids = np.union1d(
+            _unpack(summary.job_ids), np.array([row.job_id for row in user_rows], dtype=np.int32)
+        ).astype(np.int32)
+        summary.job_ids = job_ids.tobytes()
+        summary.total += len(user_rows)
+        summary.liked += sum(1 for row in user_rows if row.liked)
+        summary.archived_through = max(
+            [row.created_at for row in user_rows] + [summary.archived_through or datetime.min]
+        )
+        db.session.add(summary)
+
+    # The batch is the first rows by id matching ``archivable``, so the same
+    # predicate over its id range deletes exactly those rows
+    Swipe.query.filter(
+        archivable, Swipe.id >= rows[0].id, Swipe.id <= rows[-1].id
+    ).delete(synchronize_session=False)
+    db.session.commit()
+
+
+def _remove_orphans():
+    """Delete archive files whose manifest row never committed."""
+    root = current_app.config['SWIPE_ARCHIVE_PATH']
+    if not os.path.isdir(root):
+        return
+    known = {path for (path,) in db.session.query(SwipeArchive.path)}
+    for directory, _, files in os.walk(root):
+        for name in files:
+            relative = os.path.relpath(os.path.join(directory, name), root)
+            if relative not in known:
+                os.remove(os.path.join(root, relative))
+
+
+def archive(dry_run=False):
+    """Move swipes older than SWIPE_HOT_MONTHS out of the hot table.
+
+    Each batch becomes one compressed columnar file per month, and each
+    user's archived job IDs are folded into their SwipeSummary so
+    has_swiped() keeps working. File manifest, summaries and the delete
+    commit together.
+    """
+    cutoff = _archive_cutoff()
+    archivable = _archivable(cutoff)
+    if dry_run:
+        return db.session.query(db.func.count(Swipe.id)).filter(archivable).scalar()
+
+    _remove_orphans()
+    batch_size = current_app.config['SWIPE_ARCHIVE_BATCH_SIZE']
+    total = 0
+    while True:
+        rows = (db.session.query(Swipe.id, Swipe.user_id, Swipe.job_id, Swipe.liked, Swipe.created_at)
+                .filter(archivable)
+                .order_by(Swipe.id)
+                .limit(batch_size)
+                .all())
+        if not rows:
+            return total
+        _archive_batch(rows, archivable)
+        total += len(rows)
+
+
+def read_archive(month):
+    """All archived swipes for a 'YYYY-MM' month as a dict of column arrays."""
+    root = current_app.config['SWIPE_ARCHIVE_PATH']
+    paths = [path for (path,) in db.session.query(SwipeArchive.path)
+             .filter_by(month=month).order_by(SwipeArchive.min_swipe_id)]
+    parts = defaultdict(list)
+    for path in paths:
+        with np.load(os.path.join(root, path)) as data:
+            for column in _ARCHIVE_COLUMNS:
+                parts[column].append(data[column])
+    return {column: np.concatenate(parts[column]) if parts[column] else np.empty(0)
+            for column in _ARCHIVE_COLUMNS}
+
+
+@swipes_cli.command('archive')
+@click.option('--dry-run', is_flag=True, help='Only count the swipes that would be archived.')
+def archive_command(dry_run):
+    """Archive swipes older than SWIPE_HOT_MONTHS."""
+    if dry_run:
+        click.echo(f'{archive(dry_run=True)} swipes would be archived')
+    else:
+        click.echo(f'Archived {archive()} swipes')
+
+
+def init_app(app):
+    app.cli.add_command(swipes_cli)
+    register_periodic(app, 'swipe-archiver', app.config['SWIPE_ARCHIVE_INTERVAL'], archive)
@@ -0,0 +1,364 @@
+import fcntl
+import json
+import os
+import re
+import shutil
+import threading
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import click
+import numpy as np
+from flask import current_app
+from flask.cli import AppGroup
+
+from application import db
+from application.models.job import Job
+
+search_cli = AppGroup('search', help='Maintain the semantic search index.')
+
+# Index writes run off the request thread, one at a time
+_index_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='vector-index')
+
+# Rewritten before tokenizing so different phrasings hash to the same terms
+SYNONYMS = {
+    'server side': 'backend',
+    'server-side': 'backend',
+    'back end': 'backend',
+    'back-end': 'backend',
+    'front end': 'frontend',
+    'front-end': 'frontend',
+    'client side': 'frontend',
+    'client-side': 'frontend',
+    'full stack': 'fullstack',
+    'full-stack': 'fullstack',
+    'developer': 'engineer',
+    'programmer': 'engineer',
+    'dev': 'engineer',
+    'swe': 'software engineer',
+    'ml': 'machine learning',
+    'k8s': 'kubernetes',
+    'js': 'javascript',
+    'ts': 'typescript',
+    'postgresql': 'postgres',
+    'golang': 'go',
+    'sre': 'site reliability',
+}
+
+_SYNONYM_PATTERN = re.compile(
+    r'\b(' + '|'.join(sorted(map(re.escape, SYNONYMS), key=len, reverse=True)) + r')s?\b'
+)
+_WORD = re.compile(r'\w+')
+
+
+def _tokens(text):
+    text = _SYNONYM_PATTERN.sub(lambda m: SYNONYMS[m.group(1)], (text or '').lower())
+    # Crude plural folding; applied to queries and documents alike
+    return [w[:-1] if len(w) > 3 and w.endswith('s') and not w.endswith('ss') else w
+            for w in _WORD.findall(text)]
+
+
+def term_buckets(text, dim):
+    """Hashed unigram and bigram buckets for a piece of text."""
+    tokens = _tokens(text)
+    terms = tokens + [f'{a} {b}' for a, b in zip(tokens, tokens[1:])]
+    return np.array([zlib.crc32(term.encode()) % dim for term in terms], dtype=np.int64)
+
+
+# Vectors are stored column-major in fixed segments of this many rows, so
+# a query reads only its own few term columns, each one contiguous
+SEGMENT_ROWS = 65536
+
+
+def job_text(title, description, required_skills, preferred_skills):
+    # Title twice: it says more about the role than the rest of the text
+    return ' '.join(filter(None, [title, title, description, required_skills, preferred_skills]))
+
+
+class VectorIndex:
+    """Hashed TF-IDF vectors in memory-mapped files, one row per job.
+
+    The matrix file is a sequence of (dim, SEGMENT_ROWS) float32 blocks;
+    growing it appends a block without moving existing data.
+
+    Rows are only ever appended. An update tombstones the job's old row
+    (zeroes it) and appends a new one, so readers never see a half-written
+    vector. ``meta.json`` is replaced last on every write; readers reload
+    their maps when its mtime changes, which is how other processes'
+    writes become visible.
+    """
+
+    def __init__(self, path, dim):
+        self.path = path
+        self.dim = dim
+        self._meta_mtime = None
+        self._lock = threading.Lock()
+        self.count = self.capacity = self.docs = self.tombstones = 0
+        self.vectors = self.ids = None
+        self.df = np.zeros(dim, dtype=np.int64)
+        self.refresh()
+
+    def _file(self, name):
+        return os.path.join(self.path, name)
+
+    def refresh(self):
+        try:
+            mtime = os.stat(self._file('meta.json')).st_mtime_ns
+        except FileNotFoundError:
+            return
+        if mtime == self._meta_mtime:
+            return
+        with open(self._file('meta.json')) as f:
+            meta = json.load(f)
+        if meta['dim'] != self.dim:
+            raise ValueError(f"Index at {self.path} has dim {meta['dim']}, expected {self.dim}; "
+                             "run `flask search reindex`")
+        self._open(meta['capacity'])
+        self.count = meta['count']
+        self.docs = meta['docs']
+        self.tombstones = meta['tombstones']
+        self.df = np.fromfile(self._file('df.i64'), dtype=np.int64)
+        self._meta_mtime = mtime
+
+    def _open(self, capacity):
+        self.capacity = capacity
+        if capacity:
+            self.vectors = np.memmap(self._file('vectors.f32'), dtype=np.float32, mode='r+',
+                                     shape=(capacity // SEGMENT_ROWS, self.dim, SEGMENT_ROWS))
+            self.ids = np.memmap(self._file('ids.i32'), dtype=np.int32, mode='r+', shape=(capacity,))
+
+    def _grow(self, needed):
+        capacity = -(-needed // SEGMENT_ROWS) * SEGMENT_ROWS
+        if capacity <= self.capacity:
+            return
+        for name, row_bytes in (('vectors.f32', self.dim * 4), ('ids.i32', 4)):
+            with open(self._file(name), 'ab') as f:
+                f.truncate(capacity * row_bytes)
+        self._open(capacity)
+
+    def _row(self, row):
+        return self.vectors[row // SEGMENT_ROWS, :, row % SEGMENT_ROWS]
+
+    def _write_meta(self):
+        if self.capacity:
+            self.vectors.flush()
+            self.ids.flush()
+        self.df.tofile(self._file('df.i64.tmp'))
+        os.replace(self._file('df.i64.tmp'), self._file('df.i64'))
+        with open(self._file('meta.json.tmp'), 'w') as f:
+            json.dump({
+                'dim': self.dim,
+                'capacity': self.capacity,
+                'count': self.count,
+                'docs': self.docs,
+                'tombstones': self.tombstones,
+            }, f)
+        os.replace(self._file('meta.json.tmp'), self._file('meta.json'))
+        self._meta_mtime = os.stat(self._file('meta.json')).st_mtime_ns
+
+    @contextmanager
+    def writing(self):
+        """Exclusive across threads and processes, on an up-to-date view."""
+        os.makedirs(self.path, exist_ok=True)
+        with self._lock, open(self.path + '.lock', 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                self.refresh()
+                yield self
+                self._write_meta()
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def idf(self):
+        return (np.log((1 + self.docs) / (1 + self.df)) + 1).astype(np.float32)
+
+    def vectorize(self, buckets, idf=None):
+        """L2-normalized TF-IDF vector for a bag of hashed terms."""
+        counts = np.bincount(buckets, minlength=self.dim).astype(np.float32)
+        vector = np.log1p(counts) * (self.idf() if idf is None else idf)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _tombstone(self, job_id):
+        if not self.count:
+            return
+        for row in np.flatnonzero(self.ids[:self.count] == job_id):
+            self.df[np.flatnonzero(self._row(row))] -= 1
+            self.docs -= 1
+            self.vectors[row // SEGMENT_ROWS, :, row % SEGMENT_ROWS] = 0
+            self.ids[row] = 0
+            self.tombstones += 1
+
+    def _append(self, job_id, vector):
+        self._grow(self.count + 1)
+        self.vectors[self.count // SEGMENT_ROWS, :, self.count % SEGMENT_ROWS] = vector
+        self.ids[self.count] = job_id
+        self.count += 1
+
+    def upsert(self, job_id, text):
+        """Call inside ``writing()``."""
+        self._tombstone(job_id)
+        buckets = term_buckets(text, self.dim)
+        if not len(buckets):
+            return
+        self.df[np.unique(buckets)] += 1
+        self.docs += 1
+        self._append(job_id, self.vectorize(buckets))
+
+    def remove(self, job_id):
+        """Call inside ``writing()``."""
+        self._tombstone(job_id)
+
+    def search(self, text, k):
+        """Top ``k`` (job_id, cosine score) pairs for free text, best first."""
+        self.refresh()
+        count, vectors, ids = self.count, self.vectors, self.ids
+        buckets = term_buckets(text, self.dim)
+        if not count or not len(buckets):
+            return []
+        query = self.vectorize(buckets)
+        # Queries hit a handful of buckets; only those columns can score
+        columns = np.flatnonzero(query)
+        weights = query[columns]
+
+        best_scores, best_rows = [], []
+        for start in range(0, count, SEGMENT_ROWS):
+            block = vectors[start // SEGMENT_ROWS, :, :min(SEGMENT_ROWS, count - start)]
+            scores = weights @ block[columns]
+            if len(scores) > k:
+                top = np.argpartition(scores, -k)[-k:]
+            else:
+                top = np.arange(len(scores))
+            best_scores.append(scores[top])
+            best_rows.append(top + start)
+
+        scores = np.concatenate(best_scores)
+        rows = np.concatenate(best_rows)
+        order = np.argsort(-scores, kind='stable')
+        results = []
+        for i in order:
+            # Tombstoned rows are all zeros, so they never score above 0
+            if scores[i] <= 0 or len(results) == k:
+                break
+            job_id = int(ids[rows[i]])
+            if job_id:
+                results.append((job_id, float(scores[i])))
+        return results
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_index():
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = VectorIndex(
+                current_app.config['VECTOR_INDEX_PATH'], current_app.config['VECTOR_INDEX_DIM']
+            )
+        return _index
+
+
+def _job_rows(query):
+    return query.with_entities(
+        Job.id, Job.title, Job.description, Job.required_skills, Job.preferred_skills
+    )
+
+
+def search(text, k):
+    return get_index().search(text, k)
+
+
+def index_job(job_id):
+    """Queue a created, edited or deactivated job for (re)indexing."""
+    app = current_app._get_current_object()
+
+    def run():
+        with app.app_context():
+            try:
+                _index_job(job_id)
+            except Exception:
+                db.session.rollback()
+                app.logger.exception(f"Failed to update vector index for job {job_id}")
+
+    return _index_executor.submit(run)
+
+
+def _index_job(job_id):
+    row = _job_rows(Job.query.filter(Job.id == job_id, Job.is_active == True)).first()
+    with get_index().writing() as index:
+        if row is None:
+            index.remove(job_id)
+        else:
+            index.upsert(job_id, job_text(*row[1:]))
+
+
+def reindex(batch_size=1000):
+    """Rebuild the index from every active job, then swap it in.
+
+    Two passes: document frequencies first, so every vector is weighted
+    with the same IDF, then the vectors themselves.
+    """
+    global _index
+    path = current_app.config['VECTOR_INDEX_PATH']
+    dim = current_app.config['VECTOR_INDEX_DIM']
+    build_path = path + '.new'
+    shutil.rmtree(build_path, ignore_errors=True)
+    os.makedirs(build_path)
+
+    def batches():
+        last_id = 0
+        while True:
+            rows = (_job_rows(Job.query.filter(Job.id > last_id, Job.is_active == True))
+                    .order_by(Job.id)
+                    .limit(batch_size)
+                    .all())
+            if not rows:
+                return
+            yield [(row[0], term_buckets(job_text(*row[1:]), dim)) for row in rows]
+            last_id = rows[-1][0]
+
+    build = VectorIndex(build_path, dim)
+    with build.writing():
+        for batch in batches():
+            for _, buckets in batch:
+                if len(buckets):
+                    build.df[np.unique(buckets)] += 1
+                    build.docs += 1
+        idf = build.idf()
+        for batch in batches():
+            build._grow(build.count + len(batch))
+            for job_id, buckets in batch:
+                if len(buckets):
+                    build._append(job_id, build.vectorize(buckets, idf))
+
+    # Swap directories under the writers' lock; readers pick up the new
+    # files through meta.json and keep their old maps until then
+    with open(path + '.lock', 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            old_path = path + '.old'
+            shutil.rmtree(old_path, ignore_errors=True)
+            if os.path.exists(path):
+                os.rename(path, old_path)
+            os.rename(build_path, path)
+            shutil.rmtree(old_path, ignore_errors=True)
+            os.remove(build_path + '.lock')
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    with _index_lock:
+        _index = None
+    return build.count
+
+
+@search_cli.command('reindex')
+def reindex_command():
+    """Rebuild the semantic search index from the jobs table."""
+    click.echo(f'Indexed {reindex()} jobs')
+
+
+def init_app(app):
+    app.cli.add_command(search_cli)
@@ -0,0 +1,48 @@
+import threading
+import time
+
+
+def register_periodic(app, name, interval, func, per_process=False):
+    """Register ``func`` to run every ``interval`` seconds in an app context.
+
+    Jobs that maintain shared state in the database should run in a single
+    process; ``per_process`` jobs (e.g. refreshing in-memory state) run in
+    every worker.
+    """
+    app.extensions.setdefault('background_jobs', []).append({
+        'name': name,
+        'interval': interval,
+        'func': func,
+        'per_process': per_process,
+    })
+
+
+def start_background_jobs(app, primary=True):
+    """Start registered jobs as daemon threads.
+
+    ``primary`` is False in all but one worker process, which then only
+    starts the per-process jobs.
+    """
+    started = []
+    for job in app.extensions.get('background_jobs', []):
+        if not primary and not job['per_process']:
+            continue
+        thread = threading.Thread(
+            target=_run_forever,
+            args=(app, job),
+            name=f"bg-{job['name']}",
+            daemon=True
+        )
+        thread.start()
+        started.append(thread)
+    return started
+
+
+def _run_forever(app, job):
+    while True:
+        time.sleep(job['interval'])
+        with app.app_context():
+            try:
+                job['func']()
+            except Exception:
+                app.logger.exception(f"Background job {job['name']} failed")
@@ -0,0 +1,143 @@
+import gzip
+import zlib
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; fall back to gzip only
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = {
+    'application/json',
+    'text/html',
+    'text/plain',
+    'text/css',
+    'text/csv',
+    'application/javascript',
+}
+
+
+def _accepted_encodings():
+    """Encodings the client accepts, mapped to their q-values."""
+    accepted = {}
+    for item in request.headers.get('Accept-Encoding', '').split(','):
+        parts = [part.strip() for part in item.split(';')]
+        if not parts[0]:
+            continue
+        q = 1.0
+        for param in parts[1:]:
+            if param.startswith('q='):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+        accepted[parts[0].lower()] = q
+    return accepted
+
+
+def choose_encoding(algorithms):
+    accepted = _accepted_encodings()
+    for algorithm in algorithms:
+        if algorithm == 'br' and brotli is None:
+            continue
+        q = accepted.get(algorithm, accepted.get('*', 0.0))
+        if q > 0:
+            return algorithm
+    return None
+
+
+def _compressor(encoding, config):
+    """Object with compress(chunk) -> bytes and finish() -> bytes."""
+    if encoding == 'br':
+        return _BrotliStream(config['COMPRESS_BR_LEVEL'])
+    return _GzipStream(config['COMPRESS_LEVEL'])
+
+
+class _GzipStream:
+    def __init__(self, level):
+        # wbits=31 writes a gzip header/trailer around the deflate stream
+        self._obj = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, chunk):
+        # Sync-flush so each chunk reaches the client without waiting for more
+        return self._obj.compress(chunk) + self._obj.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._obj.flush(zlib.Z_FINISH)
+
+
+class _BrotliStream:
+    def __init__(self, quality):
+        self._obj = brotli.Compressor(quality=quality)
+
+    def compress(self, chunk):
+        return self._obj.process(chunk) + self._obj.flush()
+
+    def finish(self):
+        return self._obj.finish()
+
+
+def _compress_whole(data, encoding, config):
+    if encoding == 'br':
+        return brotli.compress(data, quality=config['COMPRESS_BR_LEVEL'])
+    return gzip.compress(data, compresslevel=config['COMPRESS_LEVEL'], mtime=0)
+
+
+def _stream(iterable, compressor):
+    try:
+        for chunk in iterable:
+            if isinstance(chunk, str):
+                chunk = chunk.encode('utf-8')
+            if chunk:
+                data = compressor.compress(chunk)
+                if data:
+                    yield data
+        yield compressor.finish()
+    finally:
+        if hasattr(iterable, 'close'):
+            iterable.close()
+
+
+def _weaken_etag(response):
+    # The compressed body is a different representation, so a strong
+    # validator would be wrong; If-None-Match still matches weak tags.
+    etag = response.headers.get('ETag')
+    if etag and not etag.startswith('W/'):
+        response.headers['ETag'] = f'W/{etag}'
+
+
+def init_compression(app):
+    """Compress large text/JSON responses according to Accept-Encoding."""
+    if not app.config.get('COMPRESS_ENABLED', True):
+        return
+
+    @app.after_request
+    def compress_response(response):
+        config = app.config
+        response.vary.add('Accept-Encoding')
+
+        if (response.status_code < 200 or response.status_code in (204, 304)
+                or response.direct_passthrough
+                or 'Content-Encoding' in response.headers
+                or response.mimetype not in COMPRESSIBLE_MIMETYPES
+                or request.method == 'HEAD'):
+            return response
+
+        encoding = choose_encoding(config['COMPRESS_ALGORITHMS'])
+        if encoding is None:
+            return response
+
+        if response.is_streamed:
+            # Compress chunk by chunk instead of buffering the whole body
+            response.response = _stream(response.response, _compressor(encoding, config))
+            response.headers.pop('Content-Length', None)
+        else:
+            data = response.get_data()
+            if len(data) < config['COMPRESS_MIN_SIZE']:
+                return response
+            response.set_data(_compress_whole(data, encoding, config))
+
+        response.headers['Content-Encoding'] = encoding
+        _weaken_etag(response)
+        return response
@@ -0,0 +1,130 @@
+import itertools
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from flask import current_app, g, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import create_engine, event
+from sqlalchemy.sql import Delete, Insert, Update
+
+STICKY_COOKIE = 'db_sticky_until'
+
+
+class RoutingSession(Session):
+    """Session that sends reads from ``@read_only`` routes to a replica.
+
+    Writes, flushes and any request inside the read-your-writes window
+    always go to the primary engine.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and _use_replica(clause):
+            engine = _next_replica()
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _mark_write(session, flush_context):
+    if has_request_context():
+        g.db_wrote = True
+
+
+def _use_replica(clause):
+    if not has_request_context() or not g.get('db_read_only'):
+        return False
+    if isinstance(clause, (Insert, Update, Delete)):
+        return False
+    return not _is_sticky()
+
+
+def _is_sticky():
+    try:
+        sticky_until = float(request.cookies.get(STICKY_COOKIE, 0))
+    except ValueError:
+        return False
+    return sticky_until > time.time()
+
+
+def _next_replica():
+    replicas = current_app.extensions.get('db_replicas')
+    if not replicas or not replicas['engines']:
+        return None
+    return next(replicas['cycle'])
+
+
+def read_only(f):
+    """Route decorator: allow this endpoint's queries to hit a replica."""
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        g.db_read_only = True
+        return f(*args, **kwargs)
+    return decorated
+
+
+@contextmanager
+def primary():
+    """Send the block's queries to the primary, even inside a ``@read_only`` route.
+
+    For code on a read path that has to see (or write) the current state.
+    """
+    if not has_request_context():
+        yield
+        return
+    previous = g.get('db_read_only')
+    g.db_read_only = False
+    try:
+        yield
+    finally:
+        g.db_read_only = previous
+
+
+def init_replicas(app):
+    uris = app.config.get('SQLALCHEMY_REPLICA_URIS') or []
+    engines = [create_engine(uri, **app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}))
+               for uri in uris]
+    app.extensions['db_replicas'] = {
+        'engines': engines,
+        'cycle': itertools.cycle(engines) if engines else None,
+    }
+
+    @app.before_request
+    def reset_write_flag():
+        g.db_wrote = False
+
+    @app.after_request
+    def set_sticky_cookie(response):
+        # Pin this client to the primary for a while after it writes so it
+        # reads its own changes despite replica lag.
+        window = app.config.get('DB_READ_YOUR_WRITES_SECONDS', 0)
+        if engines and window and g.get('db_wrote'):
+            response.set_cookie(
+                STICKY_COOKIE,
+                str(time.time() + window),
+                max_age=window,
+                httponly=True,
+                samesite='Lax'
+            )
+        return response
+
+
+def replica_lag(app):
+    """Worst replication delay across the read replicas, in seconds.
+
+    Only Postgres replicas report lag; others (and no replicas) count as 0.
+    The last replay timestamp stops moving when the primary is idle, so a
+    replica that has replayed everything it received counts as caught up.
+    """
+    worst = 0.0
+    for engine in app.extensions['db_replicas']['engines']:
+        if engine.dialect.name != 'postgresql':
+            continue
+        with engine.connect() as conn:
+            lag = conn.exec_driver_sql(
+                'SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 '
+                'ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END'
+            ).scalar()
+        worst = max(worst, float(lag))
+    return worst
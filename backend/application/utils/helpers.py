@@ -0,0 +1,35 @@
+from flask import jsonify, make_response, request
+
+
+def make_etag(*parts):
+    """Strong ETag built from identifying parts, e.g. ('job', 12, 3)."""
+    return '"' + '-'.join(str(part) for part in parts) + '"'
+
+
+def _etag_in(header_value, etag):
+    if not header_value:
+        return False
+    if header_value.strip() == '*':
+        return True
+    candidates = [value.strip() for value in header_value.split(',')]
+    # Weak comparison is fine here: our tags are derived from version numbers
+    return etag in candidates or f'W/{etag}' in candidates
+
+
+def not_modified(etag):
+    """A 304 response if the client's If-None-Match covers ``etag``, else None."""
+    if _etag_in(request.headers.get('If-None-Match'), etag):
+        response = make_response('', 304)
+        response.headers['ETag'] = etag
+        return response
+    return None
+
+
+def check_if_match(etag):
+    """An error response unless the request's If-Match matches ``etag``."""
+    if_match = request.headers.get('If-Match')
+    if not if_match:
+        return jsonify({'error': 'If-Match header required'}), 428
+    if not _etag_in(if_match, etag):
+        return jsonify({'error': 'Resource has been modified', 'etag': etag}), 412
+    return None
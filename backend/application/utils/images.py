@@ -0,0 +1,68 @@
+import hashlib
+import io
+import os
+import tempfile
+
+from PIL import Image, ImageOps
+
+# name -> (bounding box, crop to exactly that box)
+VARIANTS = {
+    'thumb': ((128, 128), True),
+    'card': ((600, 800), True),
+    'full': ((1600, 1600), False),
+}
+JPEG_QUALITY = 82
+
+
+class InvalidImage(ValueError):
+    pass
+
+
+def variant_path(root, digest, name):
+    return os.path.join(root, digest[:2], digest, f'{name}.jpg')
+
+
+def process_picture(data, root, max_pixels):
+    """Write every variant of an uploaded image; returns its content hash.
+
+    Runs in a worker process or a native thread, so it takes and returns
+    only plain values and changes no process-wide state. Variants live
+    under the SHA-256 of the original bytes, which makes re-uploads free
+    and lets the files be cached forever.
+    """
+    digest = hashlib.sha256(data).hexdigest()
+    if all(os.path.exists(variant_path(root, digest, name)) for name in VARIANTS):
+        return digest
+
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            # open() only reads the header, so bombs are rejected before any
+            # decoding; Image.MAX_IMAGE_PIXELS and warning filters are global
+            width, height = image.size
+            if width * height > max_pixels:
+                raise InvalidImage(f'Image is too large: {width}x{height} pixels')
+            # JPEGs can decode at a reduced scale, much cheaper than full size
+            image.draft('RGB', VARIANTS['full'][0])
+            image = ImageOps.exif_transpose(image).convert('RGB')
+    except (OSError, Image.DecompressionBombError) as e:
+        raise InvalidImage(f'Unsupported or corrupt image: {e}')
+
+    os.makedirs(os.path.dirname(variant_path(root, digest, 'full')), exist_ok=True)
+    for name, (size, crop) in VARIANTS.items():
+        if crop:
+            variant = ImageOps.fit(image, size, Image.LANCZOS)
+        else:
+            variant = image.copy()
+            variant.thumbnail(size, Image.LANCZOS)
+        path = variant_path(root, digest, name)
+        # Unique per call: threads share a pid, and the same bytes can be
+        # uploaded twice at once
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as tmp_file:
+                variant.save(tmp_file, 'JPEG', quality=JPEG_QUALITY, optimize=True, progressive=True)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    return digest
@@ -0,0 +1,81 @@
+import threading
+import time
+
+from application.extensions import db
+
+
+class PoolStats:
+    """Connection acquisition counters for one engine in this process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.acquired = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record(self, wait):
+        with self._lock:
+            self.acquired += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'acquired': self.acquired,
+                'avg_wait_ms': round(self.total_wait / self.acquired * 1000, 3) if self.acquired else 0.0,
+                'max_wait_ms': round(self.max_wait * 1000, 3),
+            }
+
+
+def _instrument(engine):
+    if getattr(engine, '_pool_stats', None) is not None:
+        return
+    stats = PoolStats()
+    raw_connection = engine.raw_connection
+
+    # Engine.raw_connection is where a Connection waits on the pool; wrapping
+    # it (rather than the pool object) survives engine.dispose() recreating
+    # the pool after a fork.
+    def timed_raw_connection(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return raw_connection(*args, **kwargs)
+        finally:
+            stats.record(time.perf_counter() - start)
+
+    engine.raw_connection = timed_raw_connection
+    engine._pool_stats = stats
+
+
+def _engines(app):
+    with app.app_context():
+        engines = {'primary' if key is None else key: engine
+                   for key, engine in db.engines.items()}
+    for i, engine in enumerate(app.extensions.get('db_replicas', {}).get('engines', [])):
+        engines[f'replica-{i}'] = engine
+    return engines
+
+
+def instrument_engines(app):
+    for engine in _engines(app).values():
+        _instrument(engine)
+
+
+def pool_status(app):
+    """Pool occupancy plus acquisition wait times for every engine."""
+    status = {}
+    for name, engine in _engines(app).items():
+        pool = engine.pool
+        entry = {'url': engine.url.render_as_string(hide_password=True),
+                 'pool_class': type(pool).__name__}
+        # Only queue-style pools track these
+        for attr in ('size', 'checkedin', 'checkedout', 'overflow'):
+            method = getattr(pool, attr, None)
+            if callable(method):
+                entry[attr] = method()
+        stats = getattr(engine, '_pool_stats', None)
+        if stats is not None:
+            entry.update(stats.snapshot())
+        status[name] = entry
+    return status
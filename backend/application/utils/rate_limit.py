@@ -0,0 +1,194 @@
+import math
+import os
+import sqlite3
+import threading
+import time
+from functools import wraps
+
+from flask import current_app, g, jsonify, request
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+
+_PERIODS = {'second': 1, 'minute': 60, 'hour': 3600, 'day': 86400}
+
+
+def parse_rate(value):
+    """'10/minute' -> (tokens per second, bucket capacity).
+
+    Raises ValueError for anything else, including a zero count.
+    """
+    count, _, period = str(value).partition('/')
+    period = period.strip().rstrip('s')
+    try:
+        count = int(count)
+    except ValueError:
+        count = 0
+    if count <= 0 or period not in _PERIODS:
+        raise ValueError(
+            f"Invalid rate limit {value!r}: expected '<count>/<{'|'.join(_PERIODS)}>' with count > 0"
+        )
+    return count / _PERIODS[period], count
+
+
+class MemoryBackend:
+    """Token buckets in this process only."""
+
+    max_keys = 100000
+
+    def __init__(self):
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def take(self, key, rate, capacity, cost=1):
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated, _ = self._buckets.get(key, (capacity, now, now))
+            tokens, retry_after = _refill_and_take(tokens, updated, now, rate, capacity, cost)
+            # A bucket that would have refilled by then is the same as no bucket
+            full_at = now + (capacity - tokens) / rate
+            self._buckets[key] = (tokens, now, full_at)
+            if len(self._buckets) > self.max_keys:
+                self._buckets = {k: v for k, v in self._buckets.items() if v[2] > now}
+        return retry_after
+
+
+class SQLiteBackend:
+    """Token buckets in a local SQLite file shared by all worker processes."""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._takes = 0
+        self._connect().execute(
+            'CREATE TABLE IF NOT EXISTS buckets '
+            '(key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)'
+        )
+
+    def _connect(self):
+        # Connections can't be shared across threads or a fork
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def take(self, key, rate, capacity, cost=1):
+        conn = self._connect()
+        now = time.time()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute('SELECT tokens, updated FROM buckets WHERE key = ?', (key,)).fetchone()
+            tokens, updated = row if row else (capacity, now)
+            tokens, retry_after = _refill_and_take(tokens, updated, now, rate, capacity, cost)
+            conn.execute(
+                'INSERT OR REPLACE INTO buckets (key, tokens, updated) VALUES (?, ?, ?)',
+                (key, tokens, now)
+            )
+            self._takes += 1
+            if self._takes % 1000 == 0:
+                conn.execute('DELETE FROM buckets WHERE updated < ?', (now - 86400,))
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return retry_after
+
+
+def _refill_and_take(tokens, updated, now, rate, capacity, cost=1):
+    """Returns the new token count and 0, or seconds to wait if too few."""
+    tokens = min(capacity, tokens + max(now - updated, 0) * rate)
+    cost = min(cost, capacity)
+    if tokens >= cost:
+        return tokens - cost, 0
+    return tokens, (cost - tokens) / rate
+
+
+def _identity():
+    try:
+        verify_jwt_in_request(optional=True)
+        identity = get_jwt_identity()
+    except Exception:
+        identity = None
+    if identity is not None:
+        return f'user:{identity}'
+    return f'ip:{request.remote_addr}'
+
+
+def rate_limit(name, default='60/minute', cost=None):
+    """Limit an endpoint per identity (JWT user, else client IP).
+
+    The rate comes from RATE_LIMITS[name] in config, falling back to
+    ``default``. Over-limit requests get 429 with Retry-After. ``cost``
+    is a callable giving the tokens a request takes, for endpoints that
+    do several actions at once; the default is one.
+    """
+    parse_rate(default)
+
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            app = current_app
+            if request.method == 'OPTIONS' or not app.config.get('RATE_LIMIT_ENABLED', True):
+                return f(*args, **kwargs)
+
+            rate, capacity = parse_rate(app.config.get('RATE_LIMITS', {}).get(name, default))
+            backend = app.extensions['rate_limit_backend']
+            tokens = cost() if cost else 1
+            retry_after = backend.take(f'{name}:{_identity()}', rate, capacity, tokens)
+            if retry_after:
+                response = jsonify({'error': 'Too many requests'})
+                response.status_code = 429
+                response.headers['Retry-After'] = str(math.ceil(retry_after))
+                return response
+            return f(*args, **kwargs)
+        return decorated
+    return decorator
+
+
+def init_rate_limiting(app):
+    # Fail at startup rather than on the first limited request
+    for name, value in app.config.get('RATE_LIMITS', {}).items():
+        try:
+            parse_rate(value)
+        except ValueError as e:
+            raise ValueError(f'RATE_LIMITS[{name!r}]: {e}') from None
+    if app.config.get('RATE_LIMIT_BACKEND') == 'sqlite':
+        backend = SQLiteBackend(app.config['RATE_LIMIT_SQLITE_PATH'])
+    else:
+        backend = MemoryBackend()
+    app.extensions['rate_limit_backend'] = backend
+
+
+def init_load_shedding(app):
+    """Fail fast with 503 once too many requests are already in flight.
+
+    Under gevent the in-flight count is effectively the worker's queue
+    depth; past the limit, extra requests would only wait on the DB pool
+    and push everyone's latency up.
+    """
+    limit = app.config.get('LOAD_SHED_MAX_INFLIGHT', 0)
+    if not limit:
+        return
+
+    lock = threading.Lock()
+    state = {'inflight': 0}
+
+    @app.before_request
+    def shed_load():
+        with lock:
+            state['inflight'] += 1
+            inflight = state['inflight']
+        g.load_counted = True
+        if inflight > limit and request.endpoint != 'health_check':
+            response = jsonify({'error': 'Server busy, please retry'})
+            response.status_code = 503
+            response.headers['Retry-After'] = '1'
+            return response
+
+    @app.teardown_request
+    def release_load(exc):
+        if g.pop('load_counted', False):
+            with lock:
+                state['inflight'] -= 1
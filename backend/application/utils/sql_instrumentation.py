@@ -0,0 +1,139 @@
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Every active collector (the current request's, plus any count_queries()
+# blocks around it) sees each statement executed in this context.
+_collectors = ContextVar('sql_collectors', default=())
+
+_IN_LIST = re.compile(r'\((?:\s*(?:\?|%\([^)]*\)s|%s|:\w+)\s*,)+\s*(?:\?|%\([^)]*\)s|%s|:\w+)\s*\)')
+_WHITESPACE = re.compile(r'\s+')
+
+
+def statement_shape(statement):
+    """Normalize a statement so the same query with different IN-list sizes matches."""
+    return _IN_LIST.sub('(...)', _WHITESPACE.sub(' ', statement).strip())
+
+
+class QueryCollector:
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.shapes = Counter()
+
+    def record(self, statement, duration):
+        self.count += 1
+        self.duration += duration
+        self.shapes[statement_shape(statement)] += 1
+
+    def repeated(self, threshold):
+        """Statement shapes run at least ``threshold`` times: likely N+1 loops."""
+        return [(shape, n) for shape, n in self.shapes.most_common() if n >= threshold]
+
+
+@contextmanager
+def count_queries():
+    """Collect every statement run inside the block, including in requests.
+
+        with count_queries() as queries:
+            client.get('/api/jobs/feed', headers=headers)
+        assert queries.count <= 3
+    """
+    collector = QueryCollector()
+    token = _collectors.set(_collectors.get() + (collector,))
+    try:
+        yield collector
+    finally:
+        _collectors.reset(token)
+
+
+@contextmanager
+def query_budget(max_queries):
+    """Fail the block if it issues more than ``max_queries`` statements.
+
+    Meant to back a pytest fixture that pins per-endpoint query counts.
+    """
+    with count_queries() as collector:
+        yield collector
+    if collector.count > max_queries:
+        shapes = '\n'.join(f'  {n}x {shape}' for shape, n in collector.shapes.most_common())
+        raise AssertionError(
+            f'Expected at most {max_queries} queries, got {collector.count}:\n{shapes}'
+        )
+
+
+# The start time lives on the statement's execution context, which is
+# discarded with it; a per-connection stack would keep the start of every
+# failed statement and mistime later ones on that pooled connection.
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._query_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    duration = time.perf_counter() - context._query_started
+    for collector in _collectors.get():
+        collector.record(statement, duration)
+
+    if has_request_context():
+        threshold = current_app.config.get('SQL_SLOW_QUERY_MS', 0)
+        if threshold and duration * 1000 >= threshold:
+            current_app.logger.warning(
+                'Slow query (%.1f ms) on %s %s: %s',
+                duration * 1000, request.method, request.path, statement_shape(statement)
+            )
+
+
+_listening = False
+
+
+def _listen():
+    # Listening on the Engine class covers the primary and all replicas
+    global _listening
+    if not _listening:
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+        _listening = True
+
+
+def init_sql_instrumentation(app):
+    """Per-request query count/time as Server-Timing, plus N+1 warnings."""
+    if not app.config.get('SQL_INSTRUMENTATION_ENABLED', True):
+        return
+    _listen()
+
+    @app.before_request
+    def start_collecting():
+        collector = QueryCollector()
+        g.sql_collector = collector
+        g.sql_collector_token = _collectors.set(_collectors.get() + (collector,))
+
+    @app.after_request
+    def report_queries(response):
+        collector = g.get('sql_collector')
+        if collector is None:
+            return response
+
+        response.headers.add(
+            'Server-Timing',
+            f'db;dur={collector.duration * 1000:.2f};desc="{collector.count} queries"'
+        )
+        threshold = app.config.get('SQL_N_PLUS_ONE_THRESHOLD', 0)
+        if threshold:
+            for shape, n in collector.repeated(threshold):
+                app.logger.warning(
+                    'Probable N+1 on %s %s (endpoint %s): %d x %s',
+                    request.method, request.path, request.endpoint, n, shape
+                )
+        return response
+
+    @app.teardown_request
+    def stop_collecting(exc):
+        token = g.pop('sql_collector_token', None)
+        if token is not None:
+            _collectors.reset(token)
@@ -0,0 +1,64 @@
+"""Bytes on the wire and latency per endpoint, with and without compression.
+
+    python benchmarks/compression_bench.py [--jobs 500] [--requests 50]
+"""
+import argparse
+import statistics
+import time
+
+from seed import make_app, make_user, quiet_prints, seed_jobs
+
+ENDPOINTS = [
+    ('feed', '/api/jobs/feed?limit=100'),
+    ('search', '/api/jobs/search?remote_type=remote'),
+    ('employer jobs', '/api/jobs/'),
+]
+
+
+def measure(client, url, headers, requests):
+    timings = []
+    size = 0
+    for _ in range(requests):
+        start = time.perf_counter()
+        response = client.get(url, headers=headers)
+        timings.append((time.perf_counter() - start) * 1000)
+        size = len(response.get_data())
+    return size, statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--jobs', type=int, default=500)
+    parser.add_argument('--requests', type=int, default=50)
+    args = parser.parse_args()
+    log = quiet_prints()
+
+    variants = [('identity', {}, None)]
+    for level in (1, 6, 9):
+        variants.append((f'gzip-{level}', {'COMPRESS_LEVEL': level}, 'gzip'))
+    for level in (1, 4, 9):
+        variants.append((f'br-{level}', {'COMPRESS_BR_LEVEL': level}, 'br'))
+
+    log(f'{"endpoint":<15}{"encoding":<12}{"bytes":>10}{"ratio":>8}{"p50 ms":>9}')
+    baseline = {}
+    for name, overrides, encoding in variants:
+        app = make_app(COMPRESS_ALGORITHMS=[encoding] if encoding else [], **overrides)
+        if encoding == 'br':
+            from application.utils import compression
+            if compression.brotli is None:
+                log(f'{"":<15}{name:<12}  skipped (brotli not installed)')
+                continue
+        employer_id, headers = make_user(app, 'employer@bench.test', 'employer')
+        seed_jobs(app, employer_id, args.jobs)
+        if encoding:
+            headers = dict(headers, **{'Accept-Encoding': encoding})
+
+        client = app.test_client()
+        for label, url in ENDPOINTS:
+            size, p50 = measure(client, url, headers, args.requests)
+            baseline.setdefault(label, size)
+            log(f'{label:<15}{name:<12}{size:>10}{baseline[label] / size:>8.1f}{p50:>9.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""Profile picture variant generation throughput, per worker process.
+
+    python benchmarks/picture_bench.py [--images 40] [--size 3000x2000] [--workers 1,2,4]
+
+Each upload becomes thumb, card and full JPEG variants (see
+application/utils/images.py); this runs that same function over
+synthetic photos and reports images/second and images/second/core.
+"""
+import argparse
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from PIL import Image
+
+from application.utils.images import process_picture
+
+
+def make_photo(seed, width, height):
+    """A noisy gradient JPEG: compresses and decodes roughly like a photo."""
+    rng = np.random.default_rng(seed)
+    x = np.linspace(0, 255, width, dtype=np.float32)
+    y = np.linspace(0, 255, height, dtype=np.float32)[:, None]
+    base = np.stack([x + 0 * y, y + 0 * x, (x + y) / 2], axis=-1)
+    pixels = np.clip(base + rng.normal(0, 20, base.shape), 0, 255).astype(np.uint8)
+    buffer = io.BytesIO()
+    Image.fromarray(pixels).save(buffer, 'JPEG', quality=90)
+    return buffer.getvalue()
+
+
+def run(photos, workers):
+    # Separate roots: variants that already exist are skipped
+    warmup_root, root = tempfile.mkdtemp(), tempfile.mkdtemp()
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # Warm the workers up (imports, first decode) before timing
+            list(pool.map(process_picture, photos[:workers], [warmup_root] * workers,
+                          [10 ** 9] * workers))
+            start = time.perf_counter()
+            list(pool.map(process_picture, photos, [root] * len(photos), [10 ** 9] * len(photos)))
+            return time.perf_counter() - start
+    finally:
+        shutil.rmtree(warmup_root)
+        shutil.rmtree(root)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--images', type=int, default=40)
+    parser.add_argument('--size', default='3000x2000')
+    parser.add_argument('--workers', default=f'1,{os.cpu_count()}')
+    args = parser.parse_args()
+    width, height = (int(part) for part in args.size.split('x'))
+
+    photos = [make_photo(seed, width, height) for seed in range(args.images)]
+    average_kb = sum(len(photo) for photo in photos) / len(photos) / 1024
+    print(f'{args.images} JPEGs of {width}x{height}, {average_kb:.0f} KB on average')
+    print(f'{"workers":>8}{"seconds":>10}{"images/s":>10}{"per core":>10}')
+    for workers in sorted({int(part) for part in args.workers.split(',')}):
+        elapsed = run(photos, workers)
+        rate = args.images / elapsed
+        print(f'{workers:>8}{elapsed:>10.2f}{rate:>10.1f}{rate / workers:>10.1f}')
+
+
+if __name__ == '__main__':
+    main()
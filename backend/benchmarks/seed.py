@@ -0,0 +1,84 @@
+"""Shared setup for the benchmark scripts: a throwaway SQLite app with data."""
+import os
+import random
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask_jwt_extended import create_access_token
+
+from application import create_app, db
+from application.models.job import Job
+from application.models.user import User
+from config import Config
+
+WORDS = (
+    'build scalable services python flask postgres team product customers '
+    'design review mentor ship reliable apis data pipelines ownership growth '
+    'remote collaborate roadmap infrastructure cloud security testing mobile'
+).split()
+
+LOCATIONS = ['San Francisco, CA', 'New York', 'Austin, TX', 'Seattle', 'Remote', 'London']
+
+
+class BenchConfig(Config):
+    BACKGROUND_JOBS_ENABLED = False
+
+
+def make_app(config_class=BenchConfig, **overrides):
+    """Create the app on a fresh SQLite file, with optional config overrides."""
+    overrides.setdefault(
+        'SQLALCHEMY_DATABASE_URI', 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench.db')
+    )
+    app = create_app(type('BenchConfig', (config_class,), overrides))
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+def make_user(app, email, user_type):
+    with app.app_context():
+        user = User(email=email, user_type=user_type)
+        user.set_password('benchmark')
+        user.last_login = datetime.utcnow()
+        db.session.add(user)
+        db.session.commit()
+        token = create_access_token(identity=user.id)
+        return user.id, {'Authorization': f'Bearer {token}'}
+
+
+def seed_jobs(app, employer_id, count, description_words=250):
+    rng = random.Random(42)
+    now = datetime.utcnow()
+    with app.app_context():
+        for i in range(count):
+            db.session.add(Job(
+                employer_id=employer_id,
+                title=f'Engineer {i}',
+                description=' '.join(rng.choice(WORDS) for _ in range(description_words)),
+                role_type=rng.choice(['full-time', 'contract', 'part-time']),
+                remote_type=rng.choice(['remote', 'hybrid', 'onsite']),
+                location=rng.choice(LOCATIONS),
+                salary_min=80000,
+                salary_max=rng.randrange(90000, 220000, 5000),
+                company_name='Bench Co',
+                company_description=' '.join(rng.choice(WORDS) for _ in range(60)),
+                created_at=now - timedelta(minutes=i),
+                expires_at=now + timedelta(days=30)
+            ))
+        db.session.commit()
+
+
+def quiet_prints():
+    """Route handlers print on every request; keep benchmark output readable."""
+    import builtins
+    real_print = builtins.print
+
+    def filtered(*args, **kwargs):
+        if kwargs.get('file') is None and args and str(args[0]).startswith('[bench]'):
+            real_print(*args[1:], **kwargs)
+
+    builtins.print = filtered
+    return lambda *args, **kwargs: filtered('[bench]', *args, **kwargs)
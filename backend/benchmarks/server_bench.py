@@ -0,0 +1,148 @@
+"""Throughput of the gevent entry point vs the dev server and a threaded server.
+
+    python benchmarks/server_bench.py [--clients 64] [--duration 10] [--workers 2]
+
+Each server runs in its own process against the same seeded SQLite file.
+"""
+import argparse
+import http.client
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ENDPOINTS = [
+    ('health', '/health'),
+    ('search', '/api/jobs/search?remote_type=remote'),
+]
+
+
+def serve(kind, port):
+    """Run one server flavour in this process (invoked as a subprocess)."""
+    sys.path.insert(0, BACKEND_DIR)
+    import builtins
+    builtins.print = lambda *args, **kwargs: None  # Route handlers are chatty
+
+    from application import create_app
+    app = create_app()
+
+    if kind == 'dev':
+        app.run(port=port, debug=False, threaded=True)
+    elif kind == 'threaded':
+        from socketserver import ThreadingMixIn
+        from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+        class ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+            daemon_threads = True
+
+        class QuietHandler(WSGIRequestHandler):
+            def log_message(self, *args):
+                pass
+
+        make_server('127.0.0.1', port, app, ThreadingWSGIServer, QuietHandler).serve_forever()
+
+
+def start_server(kind, port, env, workers):
+    if kind == 'gevent':
+        command = [sys.executable, os.path.join(BACKEND_DIR, 'run.py'),
+                   '--host', '127.0.0.1', '--port', str(port), '--workers', str(workers)]
+    else:
+        command = [sys.executable, os.path.abspath(__file__), '--serve', kind, '--port', str(port)]
+    process = subprocess.Popen(command, env=env, cwd=BACKEND_DIR,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    for _ in range(100):
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+            conn.request('GET', '/health')
+            conn.getresponse().read()
+            return process
+        except OSError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError(f'{kind} server did not start')
+
+
+def load(port, path, headers, clients, duration):
+    latencies = []
+    errors = 0
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def client():
+        nonlocal errors
+        local = []
+        local_errors = 0
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+                conn.request('GET', path, headers=headers)
+                response = conn.getresponse()
+                response.read()
+                conn.close()
+                if response.status != 200:
+                    local_errors += 1
+                    continue
+            except OSError:
+                local_errors += 1
+                continue
+            local.append((time.perf_counter() - start) * 1000)
+        with lock:
+            latencies.extend(local)
+            errors += local_errors
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99)] if latencies else 0
+    p50 = statistics.median(latencies) if latencies else 0
+    return len(latencies) / duration, p50, p99, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--clients', type=int, default=64)
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--workers', type=int, default=2, help='gevent worker processes')
+    parser.add_argument('--jobs', type=int, default=300)
+    parser.add_argument('--serve', help=argparse.SUPPRESS)
+    parser.add_argument('--port', type=int, default=5100)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve, args.port)
+        return
+
+    from seed import make_app, make_user, quiet_prints, seed_jobs
+    log = quiet_prints()
+
+    db_uri = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'server_bench.db')
+    app = make_app(SQLALCHEMY_DATABASE_URI=db_uri)
+    employer_id, headers = make_user(app, 'employer@bench.test', 'employer')
+    seed_jobs(app, employer_id, args.jobs, description_words=80)
+
+    env = dict(os.environ, SQLALCHEMY_DATABASE_URI=db_uri, BACKGROUND_JOBS_ENABLED='false')
+    log(f'{"server":<10}{"endpoint":<10}{"req/s":>9}{"p50 ms":>9}{"p99 ms":>9}{"errors":>8}')
+    for offset, kind in enumerate(['dev', 'threaded', 'gevent']):
+        port = args.port + offset
+        process = start_server(kind, port, env, args.workers)
+        try:
+            for label, path in ENDPOINTS:
+                rps, p50, p99, errors = load(port, path, headers, args.clients, args.duration)
+                log(f'{kind:<10}{label:<10}{rps:>9.0f}{p50:>9.1f}{p99:>9.1f}{errors:>8}')
+        finally:
+            process.terminate()
+            process.wait(timeout=60)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""Round trips per swipe: separate swipe + feed calls vs POST /api/swipes/next.
+
+    python benchmarks/swipe_session_bench.py [--jobs 2000] [--candidates 20] [--swipes 100]
+
+Each simulated candidate opens the feed once and then swipes through it.
+"""
+import argparse
+import random
+import time
+
+from seed import make_app, make_user, quiet_prints, seed_jobs
+
+
+class Session:
+    def __init__(self, client, headers):
+        self.client = client
+        self.headers = headers
+        self.requests = 0
+        self.bytes = 0
+
+    def call(self, method, url, **kwargs):
+        response = self.client.open(url, method=method, headers=self.headers, **kwargs)
+        assert response.status_code < 300, (url, response.status_code, response.get_json())
+        self.requests += 1
+        self.bytes += len(response.get_data())
+        return response
+
+    def open_feed(self, limit):
+        response = self.call('GET', f'/api/jobs/feed?limit={limit}')
+        return [job['id'] for job in response.get_json()], response.headers.get('X-Feed-Cursor')
+
+
+def separate_calls(session, swipes, rng, batch):
+    """The old client: POST each swipe, then GET the feed to replace the card."""
+    cards, cursor = session.open_feed(20)
+    for _ in range(swipes):
+        if not cards:
+            break
+        session.call('POST', '/api/swipes/', json={'job_id': cards.pop(0), 'liked': rng.random() < 0.3})
+        response = session.call('GET', f'/api/jobs/feed?limit=1&cursor={cursor}')
+        cards += [job['id'] for job in response.get_json()]
+        cursor = response.headers.get('X-Feed-Cursor')
+
+
+def combined(session, swipes, rng, batch):
+    """Swipe ``batch`` cards per POST /api/swipes/next and refill as many."""
+    cards, cursor = session.open_feed(20)
+    done = 0
+    while done < swipes and cards:
+        taken, cards = cards[:batch], cards[batch:]
+        response = session.call('POST', '/api/swipes/next', json={
+            'swipes': [{'job_id': job_id, 'liked': rng.random() < 0.3} for job_id in taken],
+            'cursor': cursor,
+            'limit': len(taken)
+        })
+        body = response.get_json()
+        cards += [job['id'] for job in body['cards']]
+        cursor = body['cursor']
+        done += len(taken)
+
+
+FLOWS = [
+    ('swipe + feed', separate_calls, 1),
+    ('next', combined, 1),
+    ('next x5', combined, 5),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--jobs', type=int, default=2000)
+    parser.add_argument('--candidates', type=int, default=20)
+    parser.add_argument('--swipes', type=int, default=100, help='per candidate')
+    args = parser.parse_args()
+    log = quiet_prints()
+
+    log(f'{"flow":<14}{"swipes":>8}{"req/swipe":>11}{"ms/swipe":>10}{"bytes/swipe":>13}')
+    for name, flow, batch in FLOWS:
+        app = make_app(RATE_LIMIT_ENABLED=False)
+        employer_id, _ = make_user(app, 'employer@bench.test', 'employer')
+        seed_jobs(app, employer_id, args.jobs, description_words=80)
+        client = app.test_client()
+        rng = random.Random(7)
+
+        requests = size = 0
+        start = time.perf_counter()
+        for i in range(args.candidates):
+            _, headers = make_user(app, f'candidate{i}@bench.test', 'candidate')
+            session = Session(client, headers)
+            flow(session, args.swipes, rng, batch)
+            requests += session.requests
+            size += session.bytes
+        elapsed = (time.perf_counter() - start) * 1000
+
+        swipes = args.candidates * args.swipes
+        log(f'{name:<14}{swipes:>8}{requests / swipes:>11.2f}'
+            f'{elapsed / swipes:>10.2f}{size / swipes:>13.0f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -7,14 +7,140 @@ load_dotenv()
 
 class Config:
     # Database
-    SQLALCHEMY_DATABASE_URI = 'sqlite:///' + os.path.join(basedir, 'app.db')
+    SQLALCHEMY_DATABASE_URI = os.environ.get(
+        'SQLALCHEMY_DATABASE_URI', 'sqlite:///' + os.path.join(basedir, 'app.db')
+    )
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
+    # Read replicas (comma-separated URLs); read-only routes are spread across
+    # these, everything else uses the primary above
+    SQLALCHEMY_REPLICA_URIS = [
+        uri.strip() for uri in os.environ.get('DATABASE_REPLICA_URLS', '').split(',')
+        if uri.strip()
+    ]
+    # After a write, keep the client on the primary for this many seconds
+    DB_READ_YOUR_WRITES_SECONDS = int(os.environ.get('DB_READ_YOUR_WRITES_SECONDS', 5))
+    
+    # Search facet counts are cached per process for this many seconds
+    FACET_CACHE_TTL = int(os.environ.get('FACET_CACHE_TTL', 60))
+    FACET_CACHE_SIZE = 512
+    
+    # Serialized profiles are cached per process, keyed by user_id
+    PROFILE_CACHE_TTL = int(os.environ.get('PROFILE_CACHE_TTL', 60))
+    PROFILE_CACHE_SIZE = 10000
+    PROFILE_BULK_MAX_IDS = 300
+    
+    # Precomputed feed queues
+    FEED_QUEUE_SIZE = 500
+    FEED_PAGE_SIZE = 20
+    SWIPE_BATCH_MAX = 20  # Swipes per POST /api/swipes/next
+    FEED_REBUILD_INTERVAL = int(os.environ.get('FEED_REBUILD_INTERVAL', 300))
+    FEED_QUEUE_MAX_AGE = 3600  # Rebuild on read if older than this
+    FEED_ACTIVE_DAYS = 14  # Only materialize for candidates seen recently
+    FEED_RECENCY_HALF_LIFE_DAYS = 7
+    FEED_NEARBY_KM = 50
+    
+    # Periodic jobs (feed materializer, ...) run in background threads
+    BACKGROUND_JOBS_ENABLED = os.environ.get('BACKGROUND_JOBS_ENABLED', 'false').lower() == 'true'
+    
+    # Near-duplicate postings (MinHash over title + description, same employer).
+    # 'reject' answers 409, 'flag' records duplicate_of_id, 'collapse' also
+    # hides flagged postings from feed and search; 'off' disables the check
+    DUPLICATE_JOB_POLICY = os.environ.get('DUPLICATE_JOB_POLICY', 'flag')
+    DUPLICATE_JOB_THRESHOLD = 0.8  # Estimated Jaccard similarity
+    DUPLICATE_INDEX_REFRESH_SECONDS = 5  # Pick up other workers' writes
+    
+    # Swipes older than SWIPE_HOT_MONTHS (whole months) move from the swipes
+    # table into compressed columnar files plus per-user summaries
+    SWIPE_HOT_MONTHS = 3
+    SWIPE_ARCHIVE_PATH = os.environ.get('SWIPE_ARCHIVE_PATH', os.path.join(basedir, 'archive', 'swipes'))
+    SWIPE_ARCHIVE_BATCH_SIZE = 5000
+    SWIPE_ARCHIVE_INTERVAL = 86400
+    
+    # Semantic search: hashed TF-IDF vectors in memory-mapped files. The
+    # matrix is VECTOR_INDEX_DIM float32s per job (1 KB at 256)
+    VECTOR_INDEX_PATH = os.environ.get('VECTOR_INDEX_PATH', os.path.join(basedir, 'vector_index'))
+    VECTOR_INDEX_DIM = 256
+    
+    # Employer analytics rollups, built from swipes by a background aggregator
+    ANALYTICS_AGGREGATE_INTERVAL = int(os.environ.get('ANALYTICS_AGGREGATE_INTERVAL', 60))
+    ANALYTICS_COMPACT_INTERVAL = 3600
+    ANALYTICS_BATCH_SIZE = 5000
+    ANALYTICS_SETTLE_SECONDS = 30  # Let in-flight swipe transactions commit first
+    ANALYTICS_HOURLY_RETENTION_DAYS = 14  # Older hours are compacted into days
+    
+    # Transactional outbox: job and swipe changes are appended to the events
+    # table in the same transaction, for consumers to read by offset
+    EVENT_BATCH_SIZE = 500
+    EVENT_SETTLE_SECONDS = 2  # Let in-flight transactions commit lower offsets
+    EVENT_RETENTION_DAYS = 7  # Kept longer while any consumer hasn't read them
+    EVENT_COMPACTED_TOPICS = ['job']  # Keep only the latest event per key
+    EVENT_COMPACT_AFTER_HOURS = 24
+    EVENT_MAINTENANCE_INTERVAL = 3600
+    
+    # Online backfills (`flask backfill run NAME`): one id range per
+    # transaction, checkpointed in backfill_progress
+    BACKFILL_BATCH_SIZE = 1000  # Ids per batch, halved after a lock timeout
+    BACKFILL_PAUSE_SECONDS = 0.05
+    BACKFILL_NICE_RATIO = 0.5  # Also sleep this fraction of each batch's run time
+    BACKFILL_MAX_REPLICA_LAG = 5  # Seconds; pause while any replica is further behind
+    BACKFILL_LAG_POLL_SECONDS = 2
+    BACKFILL_LOCK_TIMEOUT_MS = 2000  # Postgres only
+    BACKFILL_MAX_RETRIES = 5
+    BACKFILL_RETRY_SECONDS = 1  # Doubles with each consecutive failure
+    
+    # Response compression (brotli is used only if the package is installed)
+    COMPRESS_ENABLED = True
+    COMPRESS_ALGORITHMS = ['br', 'gzip']  # In order of preference
+    COMPRESS_LEVEL = int(os.environ.get('COMPRESS_LEVEL', 6))  # gzip 1-9
+    COMPRESS_BR_LEVEL = int(os.environ.get('COMPRESS_BR_LEVEL', 4))  # brotli 0-11
+    COMPRESS_MIN_SIZE = 1024  # Bytes; smaller bodies aren't worth the CPU
+    
+    # Profile pictures: resized in a process pool, stored by content hash
+    PICTURE_UPLOAD_PATH = os.path.join('uploads', 'pictures')  # Next to uploads/resumes
+    PICTURE_WORKERS = int(os.environ.get('PICTURE_WORKERS', 2))  # 0 = one per core
+    PICTURE_MAX_BYTES = 10 * 1024 * 1024
+    PICTURE_MAX_PIXELS = 40000000
+    PICTURE_PROCESS_TIMEOUT = 30
+    # Let the front proxy (nginx/Apache) send files via X-Sendfile
+    USE_X_SENDFILE = os.environ.get('USE_X_SENDFILE', 'false').lower() == 'true'
+    
     # Security - Using simple consistent keys for development
     SECRET_KEY = 'dev-secret-key'
     JWT_SECRET_KEY = 'dev-secret-key'  # Using the same key for simplicity
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=1)
     JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=30)
     
+    # Token revocation: each worker keeps a Bloom filter of revoked jtis and
+    # only checks the database on a probable hit
+    REVOCATION_SYNC_INTERVAL = 5  # Seconds until other workers see a logout
+    REVOCATION_REBUILD_INTERVAL = 3600  # Rebuild to drop expired entries
+    REVOCATION_SETTLE_SECONDS = 30  # Re-read recent revocations in case a lower id commits late
+    REVOCATION_PRUNE_INTERVAL = 3600
+    REVOCATION_BLOOM_CAPACITY = 100000
+    REVOCATION_BLOOM_ERROR_RATE = 0.001
+    
+    # Per-identity token buckets, '<count>/<second|minute|hour|day>'. The
+    # sqlite backend shares buckets across worker processes on one host.
+    RATE_LIMIT_ENABLED = True
+    RATE_LIMIT_BACKEND = os.environ.get('RATE_LIMIT_BACKEND', 'memory')  # or 'sqlite'
+    RATE_LIMIT_SQLITE_PATH = os.path.join(basedir, 'ratelimit.db')
+    RATE_LIMITS = {
+        'login': '10/minute',
+        'register': '5/minute',
+        'swipe': '120/minute',
+    }
+    
+    # Return 503 once a worker has this many requests in flight (0 = off)
+    LOAD_SHED_MAX_INFLIGHT = int(os.environ.get('LOAD_SHED_MAX_INFLIGHT', 0))
+    
+    # Per-request SQL stats (Server-Timing header), slow-query and N+1 logging
+    SQL_INSTRUMENTATION_ENABLED = True
+    SQL_SLOW_QUERY_MS = int(os.environ.get('SQL_SLOW_QUERY_MS', 100))
+    SQL_N_PLUS_ONE_THRESHOLD = 5  # Same statement this often in one request
+    
+    # Enables /api/admin/* when set; clients send it as X-Admin-Key
+    ADMIN_API_KEY = os.environ.get('ADMIN_API_KEY')
+    
     # Explicitly allow all origins for testing
     CORS_HEADERS = ['Content-Type', 'Authorization']
\ No newline at end of file
@@ -0,0 +1,40 @@
+"""unique swipe per user and job
+
+Revision ID: 2c8d4e1f7a90
+Revises: 7f3a6d2c8e15
+Create Date: 2026-10-19 23:14:05.311742
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2c8d4e1f7a90'
+down_revision = '7f3a6d2c8e15'
+branch_labels = None
+depends_on = None
+
+
+def _has_table(name):
+    return name in sa.inspect(op.get_bind()).get_table_names()
+
+
+def upgrade():
+    # swipes predates the migration history on some databases
+    if not _has_table('swipes'):
+        return
+    # Keep the first swipe of any duplicates concurrent requests left behind
+    op.execute(
+        'DELETE FROM swipes WHERE id NOT IN '
+        '(SELECT min_id FROM (SELECT MIN(id) AS min_id FROM swipes GROUP BY user_id, job_id) AS firsts)'
+    )
+    with op.batch_alter_table('swipes', schema=None) as batch_op:
+        batch_op.create_unique_constraint('uq_swipes_user_job', ['user_id', 'job_id'])
+
+
+def downgrade():
+    if not _has_table('swipes'):
+        return
+    with op.batch_alter_table('swipes', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_swipes_user_job', type_='unique')
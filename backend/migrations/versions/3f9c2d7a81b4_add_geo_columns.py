@@ -0,0 +1,51 @@
+"""add geo columns
+
+Revision ID: 3f9c2d7a81b4
+Revises: a1e36c556a09
+Create Date: 2026-10-19 09:12:40.318562
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f9c2d7a81b4'
+down_revision = 'a1e36c556a09'
+branch_labels = None
+depends_on = None
+
+
+def _has_table(name):
+    return name in sa.inspect(op.get_bind()).get_table_names()
+
+
+def upgrade():
+    with op.batch_alter_table('jobs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('latitude', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('longitude', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('geohash', sa.String(length=12), nullable=True))
+        batch_op.create_index(batch_op.f('ix_jobs_geohash'), ['geohash'], unique=False)
+
+    # profiles predates the migration history on some databases
+    if _has_table('profiles'):
+        with op.batch_alter_table('profiles', schema=None) as batch_op:
+            batch_op.add_column(sa.Column('latitude', sa.Float(), nullable=True))
+            batch_op.add_column(sa.Column('longitude', sa.Float(), nullable=True))
+            batch_op.add_column(sa.Column('geohash', sa.String(length=12), nullable=True))
+            batch_op.create_index(batch_op.f('ix_profiles_geohash'), ['geohash'], unique=False)
+
+
+def downgrade():
+    if _has_table('profiles'):
+        with op.batch_alter_table('profiles', schema=None) as batch_op:
+            batch_op.drop_index(batch_op.f('ix_profiles_geohash'))
+            batch_op.drop_column('geohash')
+            batch_op.drop_column('longitude')
+            batch_op.drop_column('latitude')
+
+    with op.batch_alter_table('jobs', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_jobs_geohash'))
+        batch_op.drop_column('geohash')
+        batch_op.drop_column('longitude')
+        batch_op.drop_column('latitude')
@@ -0,0 +1,33 @@
+"""add job minhash and duplicate_of_id
+
+Revision ID: 4a8d1f6e2b93
+Revises: 9c4e7b2d5f18
+Create Date: 2026-10-19 15:48:09.237716
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4a8d1f6e2b93'
+down_revision = '9c4e7b2d5f18'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Existing postings are signed by `flask jobs dedup`
+    with op.batch_alter_table('jobs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('minhash', sa.LargeBinary(), nullable=True))
+        batch_op.add_column(sa.Column('duplicate_of_id', sa.Integer(), nullable=True))
+        batch_op.create_index(batch_op.f('ix_jobs_duplicate_of_id'), ['duplicate_of_id'], unique=False)
+        batch_op.create_foreign_key('fk_jobs_duplicate_of_id_jobs', 'jobs', ['duplicate_of_id'], ['id'])
+
+
+def downgrade():
+    with op.batch_alter_table('jobs', schema=None) as batch_op:
+        batch_op.drop_constraint('fk_jobs_duplicate_of_id_jobs', type_='foreignkey')
+        batch_op.drop_index(batch_op.f('ix_jobs_duplicate_of_id'))
+        batch_op.drop_column('duplicate_of_id')
+        batch_op.drop_column('minhash')
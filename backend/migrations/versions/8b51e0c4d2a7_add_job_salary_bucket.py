@@ -0,0 +1,39 @@
+"""add job salary bucket
+
+Revision ID: 8b51e0c4d2a7
+Revises: 3f9c2d7a81b4
+Create Date: 2026-10-19 11:02:17.554019
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8b51e0c4d2a7'
+down_revision = '3f9c2d7a81b4'
+branch_labels = None
+depends_on = None
+
+# Frozen copy of facet_service.SALARY_BUCKET_EDGES at the time of writing
+SALARY_BUCKET_EDGES = [50000, 75000, 100000, 125000, 150000, 200000]
+
+
+def upgrade():
+    with op.batch_alter_table('jobs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('salary_bucket', sa.SmallInteger(), nullable=True))
+        batch_op.create_index(batch_op.f('ix_jobs_salary_bucket'), ['salary_bucket'], unique=False)
+
+    cases = ' '.join(
+        f'WHEN salary_max <= {edge} THEN {i}' for i, edge in enumerate(SALARY_BUCKET_EDGES)
+    )
+    op.execute(
+        f'UPDATE jobs SET salary_bucket = CASE {cases} ELSE {len(SALARY_BUCKET_EDGES)} END '
+        'WHERE salary_max IS NOT NULL'
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('jobs', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_jobs_salary_bucket'))
+        batch_op.drop_column('salary_bucket')
@@ -0,0 +1,33 @@
+"""index profiles.user_id
+
+Revision ID: b73e0a5c9d21
+Revises: 4a8d1f6e2b93
+Create Date: 2026-10-19 16:31:52.604183
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b73e0a5c9d21'
+down_revision = '4a8d1f6e2b93'
+branch_labels = None
+depends_on = None
+
+
+def _has_table(name):
+    return name in sa.inspect(op.get_bind()).get_table_names()
+
+
+def upgrade():
+    # profiles predates the migration history on some databases
+    if _has_table('profiles'):
+        with op.batch_alter_table('profiles', schema=None) as batch_op:
+            batch_op.create_index(batch_op.f('ix_profiles_user_id'), ['user_id'], unique=False)
+
+
+def downgrade():
+    if _has_table('profiles'):
+        with op.batch_alter_table('profiles', schema=None) as batch_op:
+            batch_op.drop_index(batch_op.f('ix_profiles_user_id'))
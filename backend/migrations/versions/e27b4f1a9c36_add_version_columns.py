@@ -0,0 +1,41 @@
+"""add version columns
+
+Revision ID: e27b4f1a9c36
+Revises: 5d0a6e93c7f1
+Create Date: 2026-10-19 15:48:03.227140
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e27b4f1a9c36'
+down_revision = '5d0a6e93c7f1'
+branch_labels = None
+depends_on = None
+
+
+def _has_table(name):
+    return name in sa.inspect(op.get_bind()).get_table_names()
+
+
+def upgrade():
+    with op.batch_alter_table('jobs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('version', sa.Integer(), nullable=False, server_default='1'))
+        batch_op.create_index(batch_op.f('ix_jobs_updated_at'), ['updated_at'], unique=False)
+
+    # profiles predates the migration history on some databases
+    if _has_table('profiles'):
+        with op.batch_alter_table('profiles', schema=None) as batch_op:
+            batch_op.add_column(sa.Column('version', sa.Integer(), nullable=False, server_default='1'))
+
+
+def downgrade():
+    if _has_table('profiles'):
+        with op.batch_alter_table('profiles', schema=None) as batch_op:
+            batch_op.drop_column('version')
+
+    with op.batch_alter_table('jobs', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_jobs_updated_at'))
+        batch_op.drop_column('version')
@@ -0,0 +1,148 @@
+"""Production entry point: pre-forked gevent WSGI workers.
+
+    python run.py --workers 4 --concurrency 500 --port 5000
+
+The app is created once in the master and inherited by every worker, so
+imported code and static data are shared copy-on-write. Each worker serves
+the shared listening socket with a pool of greenlets. SIGTERM drains
+in-flight requests for up to --drain-timeout seconds before exiting.
+"""
+# Monkey-patching must happen before anything imports socket, threading or
+# ssl -- in particular before SQLAlchemy builds its pool locks and before the
+# DB drivers open connections -- otherwise those stay blocking.
+from gevent import monkey
+monkey.patch_all()
+
+try:
+    # psycopg2 is a C driver; make its waits cooperative when it's in use
+    from psycogreen.gevent import patch_psycopg
+    patch_psycopg()
+except ImportError:
+    pass
+
+import argparse
+import gc
+import multiprocessing
+import os
+import signal
+import socket
+import sys
+
+import gevent
+from gevent.pool import Pool
+from gevent.pywsgi import WSGIServer
+
+from application import create_app, db
+from application.utils.background import start_background_jobs
+from config import Config
+
+
+class ServerConfig(Config):
+    # Threads don't survive fork(), so background jobs start in the workers
+    BACKGROUND_JOBS_ENABLED = False
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Run the API on gevent.')
+    parser.add_argument('--host', default=os.environ.get('HOST', '0.0.0.0'))
+    parser.add_argument('--port', type=int, default=int(os.environ.get('PORT', 5000)))
+    parser.add_argument('--workers', type=int,
+                        default=int(os.environ.get('WEB_WORKERS', multiprocessing.cpu_count())),
+                        help='Worker processes (default: CPU count)')
+    parser.add_argument('--concurrency', type=int,
+                        default=int(os.environ.get('WEB_CONCURRENCY', 500)),
+                        help='Greenlets per worker')
+    parser.add_argument('--backlog', type=int, default=2048)
+    parser.add_argument('--drain-timeout', type=float,
+                        default=float(os.environ.get('WEB_DRAIN_TIMEOUT', 30)),
+                        help='Seconds to let in-flight requests finish on SIGTERM')
+    return parser.parse_args()
+
+
+def make_listener(host, port, backlog):
+    listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    listener.bind((host, port))
+    listener.listen(backlog)
+    return listener
+
+
+def dispose_engines(app):
+    # Connections must never be shared across a fork; each worker opens its own
+    with app.app_context():
+        db.engine.dispose()
+        for engine in app.extensions.get('db_replicas', {}).get('engines', []):
+            engine.dispose()
+
+
+def run_worker(app, listener, index, args):
+    server = WSGIServer(listener, app, spawn=Pool(args.concurrency), log=None)
+
+    def drain():
+        print(f"Worker {os.getpid()} draining")
+        server.stop(timeout=args.drain_timeout)
+
+    gevent.signal_handler(signal.SIGTERM, lambda: gevent.spawn(drain))
+    gevent.signal_handler(signal.SIGINT, lambda: gevent.spawn(drain))
+
+    # Only the first worker runs shared maintenance jobs
+    if Config.BACKGROUND_JOBS_ENABLED:
+        start_background_jobs(app, primary=(index == 0))
+
+    print(f"Worker {os.getpid()} serving with {args.concurrency} greenlets")
+    server.serve_forever()
+    sys.exit(0)
+
+
+def main():
+    args = parse_args()
+
+    app = create_app(ServerConfig)
+    dispose_engines(app)
+    listener = make_listener(args.host, args.port, args.backlog)
+
+    # Move everything allocated so far out of the GC's reach so collections
+    # in the workers don't touch (and copy) the shared pages
+    gc.collect()
+    gc.freeze()
+
+    workers = {}
+    stopping = False
+
+    def spawn(index):
+        pid = os.fork()
+        if pid == 0:
+            run_worker(app, listener, index, args)
+        workers[pid] = index
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    print(f"Listening on {args.host}:{args.port} with {args.workers} workers")
+    for index in range(args.workers):
+        spawn(index)
+
+    while workers:
+        try:
+            pid, status = os.waitpid(-1, 0)
+        except ChildProcessError:
+            break
+        index = workers.pop(pid, None)
+        if index is not None and not stopping:
+            print(f"Worker {pid} exited with status {status}, restarting")
+            spawn(index)
+
+    print("All workers stopped")
+
+
+if __name__ == '__main__':
+    main()
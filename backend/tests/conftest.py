@@ -0,0 +1,122 @@
+"""Shared fixtures: a throwaway SQLite app per test with seeded users and jobs."""
+import os
+import sys
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from flask_jwt_extended import create_access_token
+
+from application import create_app, db
+from application.models.job import Job
+from application.models.profile import Profile
+from application.models.user import User
+from application.services import dedup_service, facet_service, profile_service, revocation_service, vector_service
+from application.utils import sql_instrumentation
+from config import Config
+
+
+class TestConfig(Config):
+    BACKGROUND_JOBS_ENABLED = False
+    RATE_LIMIT_ENABLED = False
+    # Synced once per app below, so no request pays for a lazy resync
+    REVOCATION_SYNC_INTERVAL = 3600
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    # Services keep per-process state; every test starts cold
+    for module in (facet_service, profile_service):
+        monkeypatch.setattr(module, '_cache', None)
+    monkeypatch.setattr(dedup_service, '_index', None)
+    monkeypatch.setattr(vector_service, '_index', None)
+    monkeypatch.setattr(revocation_service, '_state', None)
+
+    app = create_app(type('TestConfig', (TestConfig,), {
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{tmp_path / "test.db"}',
+        'VECTOR_INDEX_PATH': str(tmp_path / 'vector_index'),
+    }))
+    with app.app_context():
+        db.create_all()
+        revocation_service.sync(force_rebuild=True)
+    return app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+def _make_user(app, email, user_type):
+    with app.app_context():
+        user = User(email=email, user_type=user_type)
+        user.set_password('password')
+        user.last_login = datetime.utcnow()
+        db.session.add(user)
+        db.session.commit()
+        token = create_access_token(identity=user.id)
+        return user.id, {'Authorization': f'Bearer {token}'}
+
+
+@pytest.fixture
+def employer(app):
+    """(user_id, auth headers) for an employer."""
+    return _make_user(app, 'employer@test.example', 'employer')
+
+
+@pytest.fixture
+def candidate(app):
+    """(user_id, auth headers) for a candidate with a profile."""
+    user_id, headers = _make_user(app, 'candidate@test.example', 'candidate')
+    with app.app_context():
+        db.session.add(Profile(user_id=user_id, full_name='Casey Candidate', skills=['python']))
+        db.session.commit()
+    return user_id, headers
+
+
+@pytest.fixture
+def make_candidates(app):
+    """Create ``count`` candidates with profiles; returns their user IDs."""
+    def make(count):
+        user_ids = []
+        with app.app_context():
+            for i in range(count):
+                user = User(email=f'candidate{i}@bulk.example', user_type='candidate')
+                user.set_password('password')
+                db.session.add(user)
+                db.session.flush()
+                db.session.add(Profile(user_id=user.id, full_name=f'Candidate {i}', skills=['python', 'sql']))
+                user_ids.append(user.id)
+            db.session.commit()
+        return user_ids
+    return make
+
+
+@pytest.fixture
+def jobs(app, employer):
+    """IDs of 40 active postings by ``employer``, newest first."""
+    now = datetime.utcnow()
+    with app.app_context():
+        rows = [Job(
+            employer_id=employer[0],
+            title=f'Python Engineer {i}',
+            description='Build reliable python services and data pipelines with the team',
+            role_type=['full-time', 'contract'][i % 2],
+            remote_type=['remote', 'hybrid', 'onsite'][i % 3],
+            location='Remote',
+            salary_min=80000,
+            salary_max=100000 + i * 2500,
+            company_name='Test Co',
+            created_at=now - timedelta(minutes=i),
+            expires_at=now + timedelta(days=30)
+        ) for i in range(40)]
+        db.session.add_all(rows)
+        db.session.commit()
+        return [job.id for job in rows]
+
+
+@pytest.fixture
+def query_budget():
+    """``with query_budget(n):`` fails the test if the block runs more than n statements."""
+    return sql_instrumentation.query_budget
@@ -0,0 +1,101 @@
+"""Per-endpoint query budgets.
+
+Each budget is the endpoint's current statement count. Pages are larger
+than the budgets, so a per-row lazy load (an N+1 on Swipe.user/Swipe.job,
+say) fails here instead of in production. When an endpoint legitimately
+needs another query, raise its budget in the same change.
+"""
+import pytest
+
+from application import db
+from application.models.swipe import Swipe
+
+
+@pytest.fixture
+def swiped(app, candidate, jobs):
+    """The candidate has already swiped the last five postings."""
+    with app.app_context():
+        db.session.add_all(Swipe(user_id=candidate[0], job_id=job_id, liked=True) for job_id in jobs[-5:])
+        db.session.commit()
+    return jobs[-5:]
+
+
+def test_feed_first_page(client, candidate, swiped, query_budget):
+    # Builds and stores the candidate's queue on the first read
+    with query_budget(11):
+        response = client.get('/api/jobs/feed?limit=20', headers=candidate[1])
+    assert response.status_code == 200
+    assert len(response.get_json()) == 20
+
+
+def test_feed_next_page(client, candidate, swiped, query_budget):
+    cursor = client.get('/api/jobs/feed?limit=20', headers=candidate[1]).headers['X-Feed-Cursor']
+    with query_budget(5):
+        response = client.get(f'/api/jobs/feed?limit=20&cursor={cursor}', headers=candidate[1])
+    assert response.status_code == 200
+    ids = [job['id'] for job in response.get_json()]
+    assert ids and not set(ids) & set(swiped)
+
+
+def test_search_with_facets(client, candidate, jobs, query_budget):
+    with query_budget(2):
+        response = client.get('/api/jobs/search?role_type=full-time&remote_type=remote'
+                              '&location=remote&min_salary=120000&facets=role_type,remote_type,salary',
+                              headers=candidate[1])
+    assert response.status_code == 200
+    body = response.get_json()
+    # Seeded job i is full-time for even i, remote for i % 3 == 0 and pays
+    # 100000 + 2500 * i
+    expected = [jobs[i] for i in range(len(jobs)) if i % 6 == 0 and i >= 8]
+    assert sorted(job['id'] for job in body['results']) == sorted(expected)
+    assert body['facets']['role_type'] == {'full-time': len(expected)}
+    assert body['facets']['remote_type'] == {'remote': len(expected)}
+
+
+def test_get_job(client, candidate, jobs, query_budget):
+    with query_budget(2):
+        response = client.get(f'/api/jobs/{jobs[0]}', headers=candidate[1])
+    assert response.status_code == 200
+
+
+def test_get_job_not_modified(client, candidate, jobs, query_budget):
+    etag = client.get(f'/api/jobs/{jobs[0]}', headers=candidate[1]).headers['ETag']
+    with query_budget(1):
+        response = client.get(f'/api/jobs/{jobs[0]}', headers=dict(candidate[1], **{'If-None-Match': etag}))
+    assert response.status_code == 304
+
+
+def test_swipe_batch_and_next(app, client, candidate, swiped, jobs, query_budget):
+    cursor = client.get('/api/jobs/feed?limit=20', headers=candidate[1]).headers['X-Feed-Cursor']
+    batch = jobs[:10] + swiped[:2]
+    with query_budget(10):
+        response = client.post('/api/swipes/next', headers=candidate[1], json={
+            'swipes': [{'job_id': job_id, 'liked': False} for job_id in batch],
+            'cursor': cursor,
+            'limit': 10
+        })
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['recorded'] == jobs[:10]
+    assert body['skipped'] == sorted(swiped[:2])
+    assert len(body['cards']) == 10
+
+
+def test_profiles_bulk(client, employer, make_candidates, query_budget):
+    user_ids = make_candidates(25)
+    with query_budget(2):
+        response = client.post('/api/profiles/bulk', headers=employer[1], json={'user_ids': user_ids + [0]})
+    assert response.status_code == 200
+    body = response.get_json()
+    assert [profile['user_id'] for profile in body['profiles']] == user_ids
+    assert body['missing'] == [0]
+
+
+def test_budget_catches_backref_n_plus_one(app, swiped, query_budget):
+    # The budgets above only mean something if lazy backrefs get counted
+    with app.app_context():
+        swipes = Swipe.query.all()
+        with pytest.raises(AssertionError, match='Expected at most 2 queries'):
+            with query_budget(2):
+                for swipe in swipes:
+                    swipe.job.title, swipe.user.email